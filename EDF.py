@@ -2,17 +2,34 @@
 # RealTime course second assinment's code
 # implementation of earliest deadline first algorithm
 
-from task import task
+import heapq
+import instrumentation
+from task import taskSet
 from math import floor
 from LCM import LCM
+from hyperperiod import simulationCost
+from schedule import compressSchedule, writeTaskSetSchedule
+from result_cache import ResultCache, cache_key
 INFINITY = 9999999999
 
+# set to False to fall back on the original tick-by-tick loop
+EVENT_DRIVEN = True
+# file name to reuse schedules of task sets which were already simulated
+CACHE_FILE = None
+# bump it whenever simulateEventDriven gives different schedules
+SIMULATION_VERSION = 1
+# .json or .csv file to record time, ticks/events and hyperperiod per task set
+PROFILE_FILE = None
+
 
 def checkFeasibility(Task_list, currentTime):
     # for each task that period%currentTime == 0
     # if executed == execution it's ok, else miss have happend in system
     # if executed == execution, call reset function
 
+    if isinstance(Task_list, taskSet):
+        return currentTime == 0 or Task_list.checkPeriods(currentTime)
+
     if(currentTime == 10000):
         a = 0
         for i in range(len(Task_list)):
@@ -44,8 +61,9 @@ def readTaskLists(FileAddress):
         # I just use this here to skip this line
         taskID = tasksListDB.readline()
 
-        # Holds data about a Task list
-        taskListObj = []
+        # Holds data about a Task list, as parallel arrays (see taskSet)
+        periods = []
+        executionTimes = []
         totalU = 0
         for i in range(0, TASKS_NUMBER_IN_A_SET):
             jobInfo = tasksListDB.readline().split()
@@ -64,17 +82,20 @@ def readTaskLists(FileAddress):
             #u = float(jobInfo[1])
             #e = round(p * u)
 
-            newCreatedTask = task(p, e)
-            # increased by one, starts ID's from one
-            newCreatedTask.setID(i+1)
-            taskListObj.append(newCreatedTask)
+            periods.append(p)
+            executionTimes.append(e)
 
-        TaskSetsHolder.append(taskListObj)
+        # EDF works with implicit deadlines, deadline is the period
+        # ID's start from one
+        TaskSetsHolder.append(taskSet(periods, executionTimes, periods))
 
     return TaskSetsHolder, TASKS_SET_NUMBERS, TASKS_NUMBER_IN_A_SET
 
 
 def findMinimumDeadlineNotSeen(TaskSet, currentTime):
+    if isinstance(TaskSet, taskSet):
+        return TaskSet.minimumDeadlineNotSeen(INFINITY)
+
     minimum = INFINITY
     minID = 0
     for i in range(0, len(TaskSet)):
@@ -86,85 +107,172 @@ def findMinimumDeadlineNotSeen(TaskSet, currentTime):
 
 
 def writeSchedulerToFile(GlobalTaskSetsSchedulingArray):
+    # kept for one-shot writes, the main loop streams each task set instead
     file = open("SchedulerList.txt", "w")
 
     for i in range(0, len(GlobalTaskSetsSchedulingArray)):
         # Taskset numbers start at 1 but i starts from zero so i shifted that one unit
-        file.write("Task Set : " + str(i+1))
-        file.write("\n")
         if(len(GlobalTaskSetsSchedulingArray[i]) == 0):
-            file.write(" Missed " + " " + "\n")
+            writeTaskSetSchedule(file, i+1, None)
             continue
 
-        for j in range(0, len(GlobalTaskSetsSchedulingArray[i])):
-            #  j shows the time and the GlobalTaskSetsSchedulingArray[i][j] has the id
-            file.write(str(j) + " " +
-                       str(GlobalTaskSetsSchedulingArray[i][j]) + "\n")
+        writeTaskSetSchedule(file, i+1,
+                             compressSchedule(GlobalTaskSetsSchedulingArray[i]))
+    file.close()
 
 
 def fullyExecuted(TaskSet):
+    if isinstance(TaskSet, taskSet):
+        return TaskSet.fullyExecuted()
+
     for i in range(0, len(TaskSet)):
         if (TaskSet[i].getExecutedTime() != TaskSet[i].getExecutionTime()):
             return False
     return True
 
 
-TaskSetsHolder, TASKS_SET_NUMBERS, TASKS_NUMBER_IN_A_SET = readTaskLists(
-    "task_list.txt")
-
-# Store all scheduler results
-GlobalTaskSetsSchedulingArray = []
-# EDF algorithm starts from here
-for i in range(0, TASKS_SET_NUMBERS):
-    print("Running stage: ", i)
-    # finding hyperperiod
-    periodList = []
-    for j in range(0, TASKS_NUMBER_IN_A_SET):
-        periodList.append(TaskSetsHolder[i][j].period)
-
-    hyperPeriod = LCM(periodList)
-
-    # lest consider that our hyper period is equal to 10000
-    # hyperPeriod = 10000
-    # check for this wether it's empty or not
-    LocalTaskSetSchedulingArray = []
-
-    print(hyperPeriod)
-    k = 0
-    counterTEST = 0
-    counterTEST2 = 0
-
-    missedFlag = False
+def simulateTicks(TaskSet, hyperPeriod):
+    # the original tick-by-tick loop, one scheduling decision per time unit
+    # returns (feasible, schedule) where schedule holds the ID run at every
+    # tick, 0 when idle, up to the miss if there is one
+    schedule = []
     for k in range(0, hyperPeriod):
-
-        flagLocalSeen = False
-      
-        feasible = checkFeasibility(TaskSetsHolder[i], k)
-
-        if(feasible == False):
-            missedFlag = True
-            break
+        if not checkFeasibility(TaskSet, k):
+            return False, schedule
 
         # find the earliest deadLine task
-        minimumID = findMinimumDeadlineNotSeen(TaskSetsHolder[i], k)
-        if(minimumID > 10 or minimumID < 0):
-            print("pause")
-        # if minimumID is equal to -1 it means is idle for rest of this
-        if (minimumID == 0):
-            LocalTaskSetSchedulingArray.append(minimumID)
-            flagLocalSeen = True
-        else:
-            counterTEST += 1
+        minimumID = findMinimumDeadlineNotSeen(TaskSet, k)
+        if minimumID != 0:
             # execute that task for 1 cycle
             # this function itself handels all thing related to deadline
-            TaskSetsHolder[i][minimumID-1].execute(k)
-            LocalTaskSetSchedulingArray.append(minimumID)
-            flagLocalSeen = True
-
-    if (missedFlag == False and fullyExecuted(TaskSetsHolder[i])):
-        GlobalTaskSetsSchedulingArray.append(LocalTaskSetSchedulingArray)
-    else:
-        GlobalTaskSetsSchedulingArray.append([])
-writeSchedulerToFile(GlobalTaskSetsSchedulingArray)
+            TaskSet[minimumID-1].execute(k)
+        schedule.append(minimumID)
+    return fullyExecuted(TaskSet), schedule
+
+
+def simulateEventDriven(TaskSet, hyperPeriod):
+    # discrete-event version of the tick loop below: time jumps between job
+    # releases and completions instead of advancing one unit at a time
+    # returns (feasible, segments) where segments is a list of (start, end, ID)
+    # with ID 0 for idle time, expanding them gives the tick-by-tick schedule
+    n = len(TaskSet)
+    periods = [TaskSet[i].Period() for i in range(n)]
+    executions = [TaskSet[i].getExecutionTime() for i in range(n)]
+    executed = [0] * n
+    deadlines = list(periods)
+
+    # ready jobs ordered by absolute deadline, ties go to the bigger ID
+    # exactly like findMinimumDeadlineNotSeen (it compares with <=)
+    readyQueue = [(deadlines[i], -i) for i in range(n)]
+    heapq.heapify(readyQueue)
+    releaseQueue = [(periods[i], i) for i in range(n)]
+    heapq.heapify(releaseQueue)
+
+    segments = []
+    currentTime = 0
+    events = 0
+    while currentTime < hyperPeriod:
+        events += 1
+        # a new job is released at each period, the previous one must be done
+        while releaseQueue and releaseQueue[0][0] == currentTime:
+            _, i = heapq.heappop(releaseQueue)
+            if executed[i] != executions[i]:
+                instrumentation.count("events", events)
+                return False, segments
+            executed[i] = 0
+            deadlines[i] = currentTime + periods[i]
+            heapq.heappush(readyQueue, (deadlines[i], -i))
+            heapq.heappush(releaseQueue, (deadlines[i], i))
+
+        nextEvent = min(releaseQueue[0][0], hyperPeriod)
+
+        # drop jobs which belong to an already released cycle
+        while readyQueue and readyQueue[0][0] != deadlines[-readyQueue[0][1]]:
+            heapq.heappop(readyQueue)
+
+        if not readyQueue:
+            runningID = 0
+            end = nextEvent
+        else:
+            i = -readyQueue[0][1]
+            runningID = i + 1
+            # a task with zero execution time is never marked as seen in the
+            # tick loop, so once picked it keeps running until its deadline
+            if executions[i] == 0:
+                end = nextEvent
+            else:
+                end = min(currentTime + executions[i] - executed[i], nextEvent)
+            executed[i] += end - currentTime
+            if executed[i] == executions[i]:
+                heapq.heappop(readyQueue)
+
+        if segments and segments[-1][2] == runningID:
+            segments[-1] = (segments[-1][0], end, runningID)
+        else:
+            segments.append((currentTime, end, runningID))
+        currentTime = end
+
+    instrumentation.count("events", events)
+    # same as fullyExecuted at the end of the hyperperiod
+    for i in range(n):
+        if executed[i] != executions[i]:
+            return False, segments
+    return True, segments
+
+
+if __name__ == "__main__":
+    TaskSetsHolder, TASKS_SET_NUMBERS, TASKS_NUMBER_IN_A_SET = readTaskLists(
+        "task_list.txt")
+
+    # each schedule is written as soon as its task set is done
+    schedulerFile = open("SchedulerList.txt", "w")
+    cache = ResultCache(CACHE_FILE) if CACHE_FILE else None
+    instrumentation.enable(bool(PROFILE_FILE))
+    # EDF algorithm starts from here
+    for i in range(0, TASKS_SET_NUMBERS):
+        print("Running stage: ", i)
+        # finding hyperperiod
+        periodList = []
+        for j in range(0, TASKS_NUMBER_IN_A_SET):
+            periodList.append(TaskSetsHolder[i][j].period)
+
+        hyperPeriod = LCM(periodList)
+
+        # how long this task set is going to take before running it
+        cost = simulationCost(periodList)
+        print(hyperPeriod, "ticks,", cost["jobs"], "jobs")
+
+        if instrumentation.ENABLED:
+            instrumentation.begin("edf-simulation", taskSet=i+1,
+                                  tasks=TASKS_NUMBER_IN_A_SET, hyperPeriod=hyperPeriod,
+                                  jobs=cost["jobs"])
+
+        if EVENT_DRIVEN:
+            if cache is not None:
+                feasible, segments = cache.cached(
+                    cache_key(TaskSetsHolder[i], "edf-simulation", SIMULATION_VERSION),
+                    lambda: simulateEventDriven(TaskSetsHolder[i], hyperPeriod))
+            else:
+                feasible, segments = simulateEventDriven(TaskSetsHolder[i], hyperPeriod)
+            # Taskset numbers start at 1 but i starts from zero so i shifted that one unit
+            writeTaskSetSchedule(schedulerFile, i+1,
+                                 segments if feasible else None)
+            if instrumentation.ENABLED:
+                instrumentation.set_value("feasible", feasible)
+                instrumentation.add(instrumentation.end())
+            continue
+
+        feasible, LocalTaskSetSchedulingArray = simulateTicks(TaskSetsHolder[i], hyperPeriod)
+        writeTaskSetSchedule(schedulerFile, i+1,
+                             compressSchedule(LocalTaskSetSchedulingArray) if feasible else None)
+        if instrumentation.ENABLED:
+            instrumentation.count("ticks", len(LocalTaskSetSchedulingArray))
+            instrumentation.set_value("feasible", feasible)
+            instrumentation.add(instrumentation.end())
+    schedulerFile.close()
+    if cache is not None:
+        cache.close()
+    if PROFILE_FILE:
+        instrumentation.export(PROFILE_FILE)
 
 # we will need a function to write to file
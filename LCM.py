@@ -6,6 +6,6 @@ def LCM(input):
     # lcm = float(0)
     lcm = input[0]
     for i in input[1:]:
-        lcm = int(lcm*i/gcd(lcm, i))
+        # integer division, going through float loses precision on big hyper periods
+        lcm = lcm * i // gcd(lcm, i)
     return lcm
-
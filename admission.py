@@ -0,0 +1,181 @@
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+
+from partition import Core
+
+# Online admission control
+# A long running process keeps the task set of a running system and decides
+# whether a new task can join it. Requests are JSON objects, one per line,
+# read from stdin (answers go to stdout) or from a local socket:
+#   {"op": "add", "id": "camera", "C": 2, "T": 10, "D": 8}
+#   {"op": "check", "C": 2, "T": 10, "D": 8}   same as add, but keeps nothing
+#   {"op": "remove", "id": "camera"}
+#   {"op": "query"}                              current tasks and utilization
+#   {"op": "stats"}                              latency per kind of request
+# Every answer carries "ok" and the time the request took in "latency_us".
+# The task set lives in a partition.Core, so a change only analyses what it
+# can affect: for DM the response times of the tasks with lower priority
+# than the new or removed one, for EDF the demand from the new deadline on
+
+# latencies kept per kind of request for the percentiles of "stats"
+LATENCY_WINDOW = 10000
+
+
+class AdmissionController:
+    """running task set of one processor, tasks are known by their id"""
+
+    def __init__(self, policy="edf"):
+        self.core = Core(policy)
+        self.tasks = {}
+        self.latencies = {}
+        self.lock = threading.Lock()
+
+    def add(self, task_id, task, commit=True):
+        if task_id in self.tasks:
+            raise ValueError(f"task {task_id!r} is already admitted")
+        admitted, tier, R = self.core.admission(task)
+        if admitted and commit:
+            self.core.add(task, R)
+            self.tasks[task_id] = task
+        return {"admitted": admitted, "tier": tier}
+
+    def remove(self, task_id):
+        if task_id not in self.tasks:
+            raise ValueError(f"unknown task {task_id!r}")
+        self.core.remove(self.tasks.pop(task_id))
+        return {}
+
+    def query(self):
+        ids = {id(task): task_id for task_id, task in self.tasks.items()}
+        answer = {"policy": self.core.policy, "utilization": self.core.utilization,
+                  "tasks": [{"id": ids[id(task)], **task} for task in self.core.order]}
+        if self.core.policy == "dm" and self.core.R is not None:
+            for entry, R in zip(answer["tasks"], self.core.R):
+                entry["R"] = R
+        return answer
+
+    def stats(self):
+        answer = {}
+        for op, latencies in self.latencies.items():
+            ordered = sorted(latencies["window"])
+            answer[op] = {"count": latencies["count"],
+                          "mean_us": latencies["total"] / latencies["count"],
+                          "p50_us": ordered[len(ordered) // 2],
+                          "p99_us": ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)],
+                          "max_us": latencies["max"]}
+        return answer
+
+    def _record(self, op, latency):
+        latencies = self.latencies.setdefault(
+            op, {"count": 0, "total": 0.0, "max": 0.0, "window": deque(maxlen=LATENCY_WINDOW)})
+        latencies["count"] += 1
+        latencies["total"] += latency
+        latencies["max"] = max(latencies["max"], latency)
+        latencies["window"].append(latency)
+
+    def handle(self, request):
+        """answers one request given as a dict"""
+        start = time.perf_counter()
+        op = request.get("op")
+        with self.lock:
+            try:
+                if op in ("add", "check"):
+                    task = {"C": float(request["C"]), "T": float(request["T"]),
+                            "D": float(request.get("D", request["T"]))}
+                    if not all(math.isfinite(value) for value in task.values()):
+                        raise ValueError("C, T and D must be finite numbers")
+                    if task["C"] < 0 or task["T"] <= 0 or task["D"] <= 0:
+                        raise ValueError("C must be >= 0, T and D > 0")
+                    if task["D"] > task["T"]:
+                        raise ValueError("only constrained deadlines (D <= T) are supported")
+                    answer = self.add(request["id"] if op == "add" else None, task,
+                                      commit=op == "add")
+                elif op == "remove":
+                    answer = self.remove(request["id"])
+                elif op == "query":
+                    answer = self.query()
+                elif op == "stats":
+                    answer = self.stats()
+                else:
+                    raise ValueError(f"unknown op {op!r}")
+                answer["ok"] = True
+            except (KeyError, TypeError, ValueError) as error:
+                answer = {"ok": False, "error": str(error) if not isinstance(error, KeyError)
+                          else f"missing field {error}"}
+            except Exception as error:
+                # a bug in the analysis fails this request, not the service
+                answer = {"ok": False, "error": f"internal error: {error!r}"}
+            latency = (time.perf_counter() - start) * 10**6
+            if answer["ok"] and op != "stats":
+                self._record(op, latency)
+        answer["latency_us"] = latency
+        return answer
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError
+        except ValueError:
+            return json.dumps({"ok": False, "error": "a request is a JSON object"})
+        return json.dumps(self.handle(request))
+
+
+def serve_stream(controller, lines, output):
+    for line in lines:
+        if line.strip():
+            output.write(controller.handle_line(line) + "\n")
+            output.flush()
+
+
+def serve_socket(controller, path):
+    """serves every connection of a Unix socket at path, one thread each"""
+    import os
+    import socketserver
+    import stat
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode("utf-8")
+                if line.strip():
+                    self.wfile.write((controller.handle_line(line) + "\n").encode("utf-8"))
+
+    # only a socket left by an earlier run is replaced, never another file
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Admission control of a running task set")
+    parser.add_argument("--policy", choices=("dm", "edf"), default="edf")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="listen on this Unix socket instead of stdin/stdout")
+    args = parser.parse_args(argv)
+
+    controller = AdmissionController(args.policy)
+    if args.socket:
+        try:
+            serve_socket(controller, args.socket)
+        except FileExistsError as error:
+            parser.error(str(error))
+    else:
+        serve_stream(controller, sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
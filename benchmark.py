@@ -0,0 +1,179 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from uunifast import uunifastsBatch
+from feasibility_tests import test_rm, test_dm, test_edf, task_sets_from_arrays
+from task import taskSet
+from EDF import simulateEventDriven
+from LCM import LCM
+
+# Reproducible benchmark of the generator, the feasibility tests and the
+# simulator. Every workload has a fixed seed, so two runs time exactly the
+# same task sets and can be compared against a saved baseline:
+#   python benchmark.py --save-baseline baseline.json
+#   python benchmark.py --baseline baseline.json
+
+# alpha None means implicit deadlines
+WORKLOADS = [
+    {"name": "n10-u0.75", "sets": 2000, "tasks": 10, "utilization": 0.75, "alpha": 0.60},
+    {"name": "n100-u0.5", "sets": 500, "tasks": 100, "utilization": 0.5, "alpha": 0.60},
+    {"name": "n100-u0.75", "sets": 500, "tasks": 100, "utilization": 0.75, "alpha": 0.60},
+    {"name": "n100-u0.9", "sets": 500, "tasks": 100, "utilization": 0.9, "alpha": 0.60},
+    {"name": "n100-u1.0", "sets": 500, "tasks": 100, "utilization": 1.0, "alpha": 0.60},
+    {"name": "n100-u0.9-a0.2", "sets": 500, "tasks": 100, "utilization": 0.9, "alpha": 0.20},
+    {"name": "n100-u0.9-a0.9", "sets": 500, "tasks": 100, "utilization": 0.9, "alpha": 0.90},
+    {"name": "n100-u0.9-implicit", "sets": 500, "tasks": 100, "utilization": 0.9, "alpha": None},
+    {"name": "n100-u0.9-p10-100", "sets": 500, "tasks": 100, "utilization": 0.9, "alpha": 0.60,
+     "periods": (10, 100)},
+    {"name": "n100-u0.9-p100-1000", "sets": 500, "tasks": 100, "utilization": 0.9, "alpha": 0.60,
+     "periods": (100, 1000)},
+    {"name": "n1000-u0.9", "sets": 20, "tasks": 1000, "utilization": 0.9, "alpha": 0.60},
+    # harmonic periods keep the hyperperiod small enough to simulate
+    {"name": "sim-n10-u0.9", "sets": 200, "tasks": 10, "utilization": 0.9, "alpha": None,
+     "mode": "harmonic", "periods": (2, 16), "simulate": True},
+    {"name": "sim-n100-u0.9", "sets": 50, "tasks": 100, "utilization": 0.9, "alpha": None,
+     "mode": "harmonic", "periods": (2, 16), "simulate": True},
+]
+
+SEED = 2024
+# periods are multiplied by this before simulating so execution times are integers
+SIMULATION_SCALE = 100
+
+
+def generate(workload, seed):
+    min_period, max_period = workload.get("periods", (2, 10))
+    alpha = workload["alpha"]
+    return uunifastsBatch(workload["sets"], workload["tasks"], alpha is None,
+                          workload["utilization"], seed, alpha if alpha is not None else 0.60,
+                          workload.get("mode", "uniform"), min_period, max_period)
+
+
+def simulate_all(C, T):
+    feasible = 0
+    for c, t in zip(C.tolist(), T.tolist()):
+        periods = [p * SIMULATION_SCALE for p in t]
+        executions = [round(e * SIMULATION_SCALE) for e in c]
+        feasible += simulateEventDriven(taskSet(periods, executions, periods), LCM(periods))[0]
+    return feasible
+
+
+def stages(workload, seed):
+    """(stage name, function) pairs of a workload, each function runs one stage"""
+    arrays = {}
+
+    def run_generate():
+        arrays["C"], arrays["T"], arrays["D"] = generate(workload, seed)
+        arrays["task_sets"] = list(task_sets_from_arrays(arrays["C"], arrays["T"], arrays["D"]))
+
+    utilization = workload["utilization"]
+    implicit = workload["alpha"] is None
+    result = [
+        ("generate", run_generate),
+        ("dm", lambda: [test_dm(tasks) for tasks in arrays["task_sets"]]),
+        ("edf", lambda: [test_edf(tasks, utilization) for tasks in arrays["task_sets"]]),
+    ]
+    if implicit:
+        result.insert(1, ("rm", lambda: [test_rm(tasks, utilization) for tasks in arrays["task_sets"]]))
+    if workload.get("simulate"):
+        result.append(("simulate", lambda: simulate_all(arrays["C"], arrays["T"])))
+    return result
+
+
+def run_workload(workload, seed, memory=True):
+    """times every stage of a workload, then measures its peak memory"""
+    results = {}
+    for stage, function in stages(workload, seed):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        results[stage] = {"seconds": seconds,
+                          "sets_per_second": workload["sets"] / seconds if seconds else float("inf")}
+
+    # tracemalloc slows everything down, so memory gets its own pass
+    if memory:
+        for stage, function in stages(workload, seed):
+            tracemalloc.start()
+            function()
+            results[stage]["peak_memory_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+    return results
+
+
+def run_benchmark(workloads=WORKLOADS, seed=SEED, scale=1.0, memory=True, only=None):
+    results = {}
+    for index, workload in enumerate(workloads):
+        if only and workload["name"] not in only:
+            continue
+        workload = dict(workload, sets=max(1, round(workload["sets"] * scale)))
+        print(f"Running {workload['name']} ({workload['sets']} sets)", file=sys.stderr)
+        results[workload["name"]] = run_workload(workload, seed + index, memory)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints current throughput and memory next to the baseline and returns
+    the (workload, stage) pairs that got slower or bigger than tolerance
+    """
+    regressions = []
+    print(f"{'workload':<22} {'stage':<9} {'sets/s':>12} {'baseline':>12} {'ratio':>7} {'peak KiB':>10}")
+    for name, workload_results in results.items():
+        for stage, current in workload_results.items():
+            previous = baseline.get(name, {}).get(stage)
+            line = f"{name:<22} {stage:<9} {current['sets_per_second']:>12.1f}"
+            if previous is None:
+                print(line + f" {'-':>12} {'-':>7} {current.get('peak_memory_kb', 0):>10.0f}")
+                continue
+            ratio = current["sets_per_second"] / previous["sets_per_second"]
+            flag = ""
+            if ratio < 1 - tolerance:
+                flag = " slower"
+                regressions.append((name, stage))
+            if ("peak_memory_kb" in current and "peak_memory_kb" in previous
+                    and current["peak_memory_kb"] > previous["peak_memory_kb"] * (1 + tolerance)):
+                flag += " bigger"
+                regressions.append((name, stage))
+            print(line + f" {previous['sets_per_second']:>12.1f} {ratio:>7.2f}"
+                         f" {current.get('peak_memory_kb', 0):>10.0f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of generator, tests and simulator")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplies the number of task sets of every workload")
+    parser.add_argument("--only", nargs="*",
+                        help="run only these workloads, names separated by spaces or commas")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results as a baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slowdown or memory growth reported as a regression")
+    args = parser.parse_args()
+    if args.only:
+        args.only = [name for names in args.only for name in names.split(",") if name]
+        unknown = sorted(set(args.only) - {workload["name"] for workload in WORKLOADS})
+        if unknown:
+            parser.error(f"unknown workloads {unknown}, expected some of "
+                         f"{[workload['name'] for workload in WORKLOADS]}")
+
+    results = run_benchmark(seed=args.seed, scale=args.scale,
+                            memory=not args.no_memory, only=args.only)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+    if regressions:
+        print(f"{len(regressions)} regressions", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,220 @@
+import struct
+
+import numpy as np
+
+# Binary alternative to task_list.txt
+# The file is the magic number followed by one block per scenario:
+#   header: N (int64), n (int64), U (float64), then the dtype of the C, T and
+#           D columns (8 bytes each, "float64" or "int64")
+#   C column: N * n values, row i holds the task set i
+#   T column: N * n values
+#   D column: N * n values
+# Everything is little endian and 8 byte aligned, so columns can be
+# memory-mapped and handed out as NumPy views without any copy.
+# Each column has its own dtype, so integer periods written next to float
+# execution times come back as integers and the text round trip is exact.
+# Files of the first version, with one dtype for the three columns, are
+# still read
+
+MAGIC = b"RTTASKS2"
+HEADER = struct.Struct("<qqd8s8s8s")
+MAGIC_V1 = b"RTTASKS1"
+HEADER_V1 = struct.Struct("<qqd8s")
+
+
+def _column_dtype(column):
+    if np.issubdtype(np.asarray(column).dtype, np.integer):
+        return np.dtype("<i8")
+    return np.dtype("<f8")
+
+
+def _write_header(f, N, n, U, dtypes):
+    f.write(HEADER.pack(N, n, U, *(dtype.name.encode() for dtype in dtypes)))
+
+
+def write_scenario(f, U, C, T, D):
+    """
+    Appends one scenario, (N, n) arrays such as the ones returned by
+    uunifast.uunifastsBatch, to a file opened by open_binary_task_list.
+    Integer columns are stored as int64, anything else as float64
+    """
+    dtypes = [_column_dtype(column) for column in (C, T, D)]
+    N, n = np.shape(C)
+    _write_header(f, N, n, U, dtypes)
+    for column, dtype in zip((C, T, D), dtypes):
+        f.write(np.ascontiguousarray(column, dtype=dtype).tobytes())
+
+
+def open_binary_task_list(filename):
+    """opens filename for write_scenario, scenarios are written as they come"""
+    f = open(filename, "wb")
+    f.write(MAGIC)
+    return f
+
+
+def write_binary_task_list(filename, scenarios):
+    """Writes scenarios given as (U, C, T, D), see write_scenario"""
+    with open_binary_task_list(filename) as f:
+        for U, C, T, D in scenarios:
+            write_scenario(f, U, C, T, D)
+
+
+class BinaryTaskList:
+    """
+    Memory-mapped reader of a binary task list.
+    scenarios holds one dict per scenario with the same keys as
+    load_tasks_from_file, but "C", "T" and "D" are (N, n) views of the file
+    instead of a "task_sets" list
+    """
+
+    def __init__(self, filename):
+        self.data = np.memmap(filename, dtype=np.uint8, mode="r")
+        magic = self.data[:len(MAGIC)].tobytes()
+        if magic not in (MAGIC, MAGIC_V1):
+            raise ValueError(f"{filename} is not a binary task list")
+        header = HEADER if magic == MAGIC else HEADER_V1
+
+        self.scenarios = []
+        offset = len(MAGIC)
+        while offset < len(self.data):
+            N, n, U, *dtypes = header.unpack_from(self.data, offset)
+            dtypes = [np.dtype(dtype.rstrip(b"\0").decode()).newbyteorder("<") for dtype in dtypes]
+            offset += header.size
+            scenario = {"utilization": U, "total_task_sets": N, "tasks_per_set": n}
+            for column, dtype in zip(("C", "T", "D"), dtypes * 3 if len(dtypes) == 1 else dtypes):
+                size = N * n * dtype.itemsize
+                scenario[column] = self.data[offset:offset + size].view(dtype).reshape(N, n)
+                offset += size
+            self.scenarios.append(scenario)
+
+    def task_set(self, scenario_index, task_set_index):
+        """(C, T, D) views of one task set"""
+        scenario = self.scenarios[scenario_index]
+        return (scenario["C"][task_set_index],
+                scenario["T"][task_set_index],
+                scenario["D"][task_set_index])
+
+    def iter_task_sets(self):
+        """
+        (scenario, tasks) pairs like feasibility_tests.iter_task_sets, ready
+        for run_feasibility_tests
+        """
+        for scenario in self.scenarios:
+            header = {key: scenario[key]
+                      for key in ("utilization", "total_task_sets", "tasks_per_set")}
+            for c, t, d in zip(scenario["C"], scenario["T"], scenario["D"]):
+                yield header, [{"C": c_i, "T": t_i, "D": d_i}
+                               for c_i, t_i, d_i in zip(c.tolist(), t.tolist(), d.tolist())]
+
+    def iter_batches(self, batch_size):
+        """
+        (scenario, C, T, D) with at most batch_size rows, like
+        feasibility_tests.iter_task_set_batches but as views of the file
+        """
+        for scenario in self.scenarios:
+            header = {key: scenario[key]
+                      for key in ("utilization", "total_task_sets", "tasks_per_set")}
+            for start in range(0, scenario["total_task_sets"], batch_size):
+                yield (header, *(scenario[column][start:start + batch_size]
+                                 for column in ("C", "T", "D")))
+
+
+def _is_integer(token):
+    return token.lstrip("+-").isdigit()
+
+
+def _iter_text_batches(filename, batch_size):
+    """
+    (scenario, rows, integers) batches of the text task list, rows holding
+    at most batch_size task sets as [C, T, D] float triples and integers
+    telling whether every C, T and D of the batch was written as an integer
+    """
+    with open(filename, encoding="utf-8") as f:
+        lines = (line.split() for line in f if line.strip())
+        for header in lines:
+            if len(header) != 3:
+                raise ValueError(f"Expected a scenario header, found: {' '.join(header)}")
+            scenario = {"utilization": float(header[2]), "total_task_sets": int(header[0]),
+                        "tasks_per_set": int(header[1])}
+            rows, integers = [], [True, True, True]
+            for _ in range(scenario["total_task_sets"]):
+                title = next(lines, None)
+                if title is None or title[0] != "Task":
+                    raise ValueError(f"Expected 'Task Set', found: {title}")
+                task_set = []
+                for _ in range(scenario["tasks_per_set"]):
+                    values = next(lines, None)
+                    if values is None or len(values) != 3:
+                        raise ValueError(f"Expected '<C> <T> <D>', found: {values}")
+                    for position, token in enumerate(values):
+                        integers[position] = integers[position] and _is_integer(token)
+                    task_set.append([float(token) for token in values])
+                rows.append(task_set)
+                if len(rows) == batch_size:
+                    yield scenario, rows, integers
+                    rows = []
+            if rows:
+                yield scenario, rows, integers
+
+
+def text_to_binary(text_filename, binary_filename, batch_size=1024):
+    """
+    Converts the text task list into the binary format.
+    Task sets are read in batches and written straight to their place in
+    the file as float64, so only one batch is in memory at a time. Once a
+    scenario is done, the columns which only held integers are turned into
+    int64 in place (both take 8 bytes) and the header is written again
+    """
+    item = np.dtype("<f8").itemsize
+
+    def finish(block, N, n, U, integers):
+        columns = block + HEADER.size
+        dtypes = [np.dtype("<i8") if integer else np.dtype("<f8") for integer in integers]
+        for position, dtype in enumerate(dtypes):
+            if dtype.kind != "i":
+                continue
+            start = columns + position * N * n * item
+            for row in range(0, N, batch_size):
+                rows = min(batch_size, N - row)
+                f.seek(start + row * n * item)
+                values = np.frombuffer(f.read(rows * n * item), dtype="<f8")
+                f.seek(start + row * n * item)
+                f.write(values.astype(dtype).tobytes())
+        f.seek(block)
+        _write_header(f, N, n, U, dtypes)
+
+    with open(binary_filename, "w+b") as f:
+        f.write(MAGIC)
+        current = None
+        for scenario, rows, batch_integers in _iter_text_batches(text_filename, batch_size):
+            N, n = scenario["total_task_sets"], scenario["tasks_per_set"]
+            if scenario is not current:
+                if current is not None:
+                    finish(block, current["total_task_sets"], current["tasks_per_set"],
+                           current["utilization"], integers)
+                current = scenario
+                row = 0
+                block = f.seek(0, 2)
+                _write_header(f, N, n, scenario["utilization"], [np.dtype("<f8")] * 3)
+                columns = block + HEADER.size
+                f.truncate(columns + 3 * N * n * item)
+            integers = batch_integers
+            values = np.array(rows, dtype="<f8")
+            for position in range(3):
+                f.seek(columns + (position * N + row) * n * item)
+                f.write(values[:, :, position].tobytes())
+            row += len(rows)
+        if current is not None:
+            finish(block, current["total_task_sets"], current["tasks_per_set"],
+                   current["utilization"], integers)
+
+
+def binary_to_text(binary_filename, text_filename):
+    """Converts the binary format back into the text task list"""
+    from uunifast import writeTaskSetArraysToFile
+
+    task_list = BinaryTaskList(binary_filename)
+    with open(text_filename, "w") as f:
+        for scenario in task_list.scenarios:
+            writeTaskSetArraysToFile(scenario["utilization"],
+                                     scenario["C"], scenario["T"], scenario["D"], f)
@@ -0,0 +1,52 @@
+import importlib
+import sys
+
+# Single entry point for the scripts of the project:
+#   python cli.py generate [uunifast.py options]
+#   python cli.py test [feasibility_tests.py options]
+#   python cli.py simulate [simulator.py options]
+#   python cli.py plot [file]            feasibility_test_graph.py
+#   python cli.py plot --alpha [file]    feasibility_test_alpha_graph.py
+#   python cli.py serve [admission.py options]
+#   python cli.py check [crosscheck.py options]
+#   python cli.py sensitivity [sensitivity.py options]
+#   python cli.py sweep [sweep.py options]
+# Only the module of the command is imported, so startup stays cheap and
+# NumPy or matplotlib are loaded only by the commands which use them
+
+COMMANDS = {
+    "generate": ("uunifast", "generates task_list.txt with UUniFast"),
+    "test": ("feasibility_tests", "RM, DM and EDF feasibility tests of a task list"),
+    "simulate": ("simulator", "simulates a task list under RM, DM, EDF or LLF"),
+    "plot": ("feasibility_test_graph", "plots the output of test, or with --alpha a sweep"),
+    "serve": ("admission", "admission control of a running task set (JSON lines)"),
+    "check": ("crosscheck", "cross-checks the fast tests and simulation against brute force"),
+    "sensitivity": ("sensitivity", "breakdown utilization of every task set of a task list"),
+    "sweep": ("sweep", "resumable sweep over utilization x alpha x task count"),
+}
+
+
+def usage():
+    lines = ["usage: python cli.py <command> [options]", "", "commands:"]
+    for name, (_, description) in COMMANDS.items():
+        lines.append(f"  {name:<12} {description}")
+    lines.append("")
+    lines.append("python cli.py <command> --help shows the options of a command")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        return 0 if argv and argv[0] in ("-h", "--help") else 2
+    command, options = argv[0], argv[1:]
+    module = COMMANDS[command][0]
+    if command == "plot" and "--alpha" in options:
+        module = "feasibility_test_alpha_graph"
+        options = [option for option in options if option != "--alpha"]
+    return importlib.import_module(module).main(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
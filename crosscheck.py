@@ -0,0 +1,136 @@
+import argparse
+import math
+import random
+import sys
+from fractions import Fraction
+
+# Cross-checks of the fast code paths against brute force
+# Each check runs a fast implementation and a slow, obviously right one over
+# random task sets and counts the sets where they disagree:
+#   edf-simulation: EDF.simulateEventDriven against the original tick loop
+#                   (EDF.simulateTicks), verdict and whole schedule
+#   edf-test:       feasibility_tests.test_edf against the processor demand
+#                   at every deadline of the hyperperiod, in exact arithmetic
+#   batch:          feasibility_batch.evaluate_batch against the RM, DM and
+#                   EDF verdicts of feasibility_tests.evaluate_task_set on
+#                   every row, which have to be the same bit for bit
+# Run it after changing any of them, it exits with 1 when a check fails
+
+CHECKS = ("edf-simulation", "edf-test", "batch")
+
+# rows per uunifastsBatch call of the batch check
+BATCH_ROWS = 50
+
+
+def integer_task_sets(rng, count, max_tasks=5, max_period=12, implicit=False):
+    """random task sets with integer C, T and D (D <= T)"""
+    for _ in range(count):
+        tasks = []
+        for _ in range(rng.randint(2, max_tasks)):
+            T = rng.randint(2, max_period)
+            C = rng.randint(1, T)
+            D = T if implicit else rng.randint(C, T)
+            tasks.append({"C": C, "T": T, "D": D})
+        yield tasks
+
+
+def float_task_sets(rng, count, max_tasks=5):
+    """random task sets like uunifast's: integer periods, C and D floats"""
+    for _ in range(count):
+        tasks = []
+        for _ in range(rng.randint(2, max_tasks)):
+            T = rng.randint(2, 10)
+            C = rng.uniform(0, 0.5) * T
+            D = rng.uniform(C, T)
+            tasks.append({"C": C, "T": T, "D": D})
+        yield tasks
+
+
+def brute_force_edf(tasks):
+    """processor demand at every deadline up to the hyperperiod, exact"""
+    C = [Fraction(task["C"]) for task in tasks]
+    T = [Fraction(task["T"]) for task in tasks]
+    D = [Fraction(task["D"]) for task in tasks]
+    if sum(c / t for c, t in zip(C, T)) > 1:
+        return False
+    H = math.lcm(*(int(t) for t in T))
+    deadlines = sorted({k * t + d for t, d in zip(T, D) for k in range(int(H / t) + 1)})
+    for instant in deadlines:
+        demand = sum(((instant - d) // t + 1) * c
+                     for c, t, d in zip(C, T, D) if instant >= d)
+        if demand > instant:
+            return False
+    return True
+
+
+def check_edf_simulation(rng, sets):
+    from EDF import simulateEventDriven, simulateTicks
+    from schedule import compressSchedule
+    from task import taskSet
+
+    mismatches = 0
+    for tasks in integer_task_sets(rng, sets, implicit=True):
+        columns = ([task["T"] for task in tasks], [task["C"] for task in tasks],
+                   [task["T"] for task in tasks])
+        H = math.lcm(*columns[0])
+        feasible, segments = simulateEventDriven(taskSet(*columns), H)
+        feasible_ticks, schedule = simulateTicks(taskSet(*columns), H)
+        if feasible != feasible_ticks or segments != compressSchedule(schedule):
+            mismatches += 1
+    return mismatches
+
+
+def check_edf_test(rng, sets):
+    from feasibility_tests import test_edf
+
+    mismatches = 0
+    for generator in (integer_task_sets, float_task_sets):
+        for tasks in generator(rng, sets // 2):
+            utilization = sum(task["C"] / task["T"] for task in tasks)
+            if test_edf(tasks, utilization) != brute_force_edf(tasks):
+                mismatches += 1
+    return mismatches
+
+
+def check_batch(rng, sets):
+    from feasibility_batch import evaluate_batch
+    from feasibility_tests import evaluate_task_set, task_sets_from_arrays
+    from uunifast import uunifastsBatch
+
+    mismatches = 0
+    for _ in range(max(1, sets // BATCH_ROWS)):
+        # utilizations up to 1, where the tests are borderline, and the
+        # period modes whose job counts land on period boundaries
+        utilization = rng.choice((0.7, 0.9, 0.95, 1.0))
+        C, T, D = uunifastsBatch(BATCH_ROWS, rng.choice((3, 10, 30)), rng.random() < 0.5,
+                                 utilization, rng.randrange(2 ** 32),
+                                 PeriodMode=rng.choice(("uniform", "harmonic", "divisor")))
+        batch = zip(*evaluate_batch(C, T, D, utilization))
+        for tasks, verdicts in zip(task_sets_from_arrays(C, T, D), batch):
+            if tuple(evaluate_task_set((0, tasks, utilization))[1:4]) != tuple(verdicts):
+                mismatches += 1
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-checks of the fast paths against brute force")
+    parser.add_argument("checks", nargs="*", default=list(CHECKS),
+                        help="among " + ", ".join(CHECKS) + " (all by default)")
+    parser.add_argument("--sets", type=int, default=2000, help="task sets per check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    unknown = [check for check in args.checks if check not in CHECKS]
+    if unknown:
+        parser.error(f"unknown checks {unknown}, expected some of {CHECKS}")
+
+    functions = {name: globals()["check_" + name.replace("-", "_")] for name in CHECKS}
+    failed = False
+    for name in args.checks:
+        mismatches = functions[name](random.Random(args.seed), args.sets)
+        print(f"{name}: {mismatches} mismatches in {args.sets} task sets")
+        failed = failed or mismatches > 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
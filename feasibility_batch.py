@@ -0,0 +1,194 @@
+import numpy as np
+
+from feasibility_tests import JOB_COUNT_EPSILON, utilization_fits
+
+# Batched feasibility tests
+# The same tests as feasibility_tests.py over (N, n) arrays of C, T and D,
+# one row per task set, as returned by uunifast.uunifastsBatch or
+# iter_task_set_batches. Every loop runs over tasks or fixed-point
+# iterations with all the rows still undecided at once, instead of over task
+# sets. Sums are taken in the same order as the scalar functions (pairwise
+# over a row where those use NumPy, left to right where they use sum()), so
+# the verdicts are the same bit for bit, not only up to rounding
+
+
+def _row_sum(values):
+    """left to right sum over the columns, like the builtin sum of a task list"""
+    total = np.zeros(values.shape[0])
+    for j in range(values.shape[1]):
+        total = total + values[:, j]
+    return total
+
+
+def _rm_limit(n):
+    return n * (2 ** (1 / n) - 1)
+
+
+def test_rm_batch(C, T, D, utilization):
+    """test_rm of every row, utilization is a scalar or one value per row"""
+    N, n = C.shape
+    return np.broadcast_to(np.asarray(utilization) <= _rm_limit(n), (N,)).copy()
+
+
+def _row_prod(values):
+    """left to right product over the columns, like math.prod"""
+    total = np.ones(values.shape[0])
+    for j in range(values.shape[1]):
+        total = total * values[:, j]
+    return total
+
+
+def response_time_analysis_batch(C, T, D):
+    """
+    response_time_analysis of every row, columns already in priority order.
+    The fixed point of task i is iterated only on the rows where every task
+    before it met its deadline and it has not converged yet. The
+    interference is summed again at every step, left to right like the
+    running prefix sums of response_time, which give the same value
+    """
+    N, n = C.shape
+    R = np.zeros(N)
+    feasible = np.ones(N, dtype=bool)
+    for i in range(n):
+        rows = np.flatnonzero(feasible)
+        if rows.size == 0:
+            break
+        C_i, D_i = C[rows, i], D[rows, i]
+        C_hp, T_hp = C[rows, :i], T[rows, :i]
+        # warm start lowered like in response_time
+        R_i = np.maximum(C_i, (R[rows] + C_i) * (1 - JOB_COUNT_EPSILON))
+        pending = np.arange(rows.size)
+        while pending.size:
+            R_prev = R_i[pending]
+            if i:
+                interference = np.add.accumulate(
+                    np.ceil(R_prev[:, None] / T_hp[pending]) * C_hp[pending], axis=1)[:, -1]
+            else:
+                interference = 0.0
+            R_next = C_i[pending] + interference
+            converged = R_next == R_prev
+            going = ~converged & (R_next <= D_i[pending])
+            # a row past its deadline keeps R_next, the check below fails it
+            R_i[pending[~converged]] = R_next[~converged]
+            pending = pending[going]
+        R[rows] = R_i
+        feasible[rows[R_i > D_i]] = False
+    return feasible
+
+
+def test_dm_batch(C, T, D):
+    """dm_cascade verdict of every row"""
+    # Ascending order by deadline, stable like sorted()
+    order = np.argsort(D, axis=1, kind="stable")
+    C = np.take_along_axis(C, order, axis=1).astype(float)
+    T = np.take_along_axis(T, order, axis=1).astype(float)
+    D = np.take_along_axis(D, order, axis=1).astype(float)
+    N, n = C.shape
+
+    verdict = np.zeros(N, dtype=bool)
+    undecided = utilization_fits(_row_sum(C / T))
+
+    density = C / D
+    constrained = undecided & (D <= T).all(axis=1)
+    bounds = constrained & ((_row_sum(density) <= _rm_limit(n))
+                            | (_row_prod(density + 1) <= 2))
+    verdict[bounds] = True
+    undecided &= ~bounds
+
+    rows = np.flatnonzero(undecided)
+    if rows.size:
+        verdict[rows] = response_time_analysis_batch(C[rows], T[rows], D[rows])
+    return verdict
+
+
+def _last_deadline_before(C, T, D, t):
+    """last_deadline_before of every row, NaN where there is none"""
+    latest = np.full(t.shape, np.nan)
+    for j in range(D.shape[1]):
+        before = D[:, j] < t
+        x = (t - D[:, j]) / T[:, j]
+        k = np.ceil(x - JOB_COUNT_EPSILON * np.maximum(1.0, np.abs(x))) - 1
+        deadline = k * T[:, j] + D[:, j]
+        # NaN compares False, so the first deadline found always replaces it
+        update = before & ~(latest >= deadline)
+        latest = np.where(update, deadline, latest)
+    return latest
+
+
+def _demand(C, T, D, t):
+    """demand (sum of dbf) of every row at its own instant t"""
+    x = (t[:, None] - D) / T
+    jobs = np.maximum(0, np.floor(x + JOB_COUNT_EPSILON * np.maximum(1.0, np.abs(x))) + 1)
+    return _row_sum(jobs * C)
+
+
+def _edf_horizon(C, T, D, utilization):
+    """edf_horizon of every row"""
+    L_a = np.full(C.shape[0], np.inf)
+    bounded = utilization < 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        L_a = np.where(bounded,
+                       np.maximum(D.max(axis=1), _row_sum((T - D) * C / T) / (1 - utilization)),
+                       L_a)
+
+    w = _row_sum(C)
+    pending = np.flatnonzero(w < L_a)
+    while pending.size:
+        w_prev = w[pending]
+        w_next = _row_sum(np.ceil(w_prev[:, None] / T[pending]) * C[pending])
+        w[pending] = w_next
+        pending = pending[(w_next != w_prev) & (w_next < L_a[pending])]
+    return np.minimum(L_a, w)
+
+
+def quick_processor_demand_analysis_batch(C, T, D, utilization):
+    """quick_processor_demand_analysis of every row"""
+    d_min = D.min(axis=1)
+    L = _edf_horizon(C, T, D, utilization)
+    t = _last_deadline_before(C, T, D, np.nextafter(L, np.inf))
+
+    feasible = np.ones(C.shape[0], dtype=bool)
+    pending = np.flatnonzero(~np.isnan(t))
+    while pending.size:
+        t_p = t[pending]
+        load = _demand(C[pending], T[pending], D[pending], t_p)
+        failed = load > t_p
+        feasible[pending[failed]] = False
+        going = ~failed & ~(load <= d_min[pending])
+        jump = going & (load < t_p)
+        step = going & ~jump
+        t[pending[jump]] = load[jump]
+        if step.any():
+            rows = pending[step]
+            t[rows] = _last_deadline_before(C[rows], T[rows], D[rows], t[rows])
+        pending = pending[going]
+        pending = pending[~np.isnan(t[pending])]
+    return feasible
+
+
+def test_edf_batch(C, T, D, utilization):
+    """edf_cascade verdict of every row, utilization is unused as in test_edf"""
+    C, T, D = (np.asarray(a, dtype=float) for a in (C, T, D))
+    U = _row_sum(C / T)
+    implicit = (D == T).all(axis=1)
+    verdict = implicit & utilization_fits(U)
+
+    undecided = ~implicit & utilization_fits(U)
+    density = undecided & (_row_sum(C / np.minimum(D, T)) <= 1)
+    verdict[density] = True
+    undecided &= ~density
+
+    rows = np.flatnonzero(undecided)
+    if rows.size:
+        verdict[rows] = quick_processor_demand_analysis_batch(C[rows], T[rows], D[rows], U[rows])
+    return verdict
+
+
+def evaluate_batch(C, T, D, utilization):
+    """
+    RM, DM and EDF verdict vectors of every row, the same as
+    evaluate_task_set (RM is False without implicit deadlines)
+    """
+    C, T, D = (np.asarray(a, dtype=float) for a in (C, T, D))
+    rm = test_rm_batch(C, T, D, utilization) & (D[:, 0] == T[:, 0])
+    return rm, test_dm_batch(C, T, D), test_edf_batch(C, T, D, utilization)
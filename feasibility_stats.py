@@ -0,0 +1,112 @@
+import json
+import math
+
+# Streaming feasibility statistics
+# Verdicts are counted as they arrive, each (scenario, method) keeps only
+# its number of trials and of feasible task sets. The ratio comes with a
+# Wilson score interval, so a scenario can stop early once the interval of
+# every method is narrow enough, and everything is written as JSON for the
+# plotting scripts instead of being parsed back from the console output
+
+# 95% confidence
+Z = 1.959963984540054
+
+METHODS = ("Rate Monotonic (RM)", "Deadline Monotonic (DM)", "Earliest Deadline First (EDF)")
+
+
+def wilson_interval(successes, trials, z=Z):
+    """Wilson score interval (low, high) of a proportion"""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    # the bounds are exactly 0 with no successes and 1 with no failures,
+    # centre - half_width only comes out as rounding noise around them
+    low = 0.0 if successes == 0 else max(0.0, centre - half_width)
+    high = 1.0 if successes == trials else min(1.0, centre + half_width)
+    return low, high
+
+
+class FeasibilityAggregator:
+    """
+    Counts verdicts per scenario and method. With max_width, a scenario is
+    converged once it has min_trials results and the Wilson interval of
+    every method is at most max_width wide
+    """
+
+    def __init__(self, methods=3, max_width=None, min_trials=30, z=Z):
+        self.methods = methods
+        self.max_width = max_width
+        self.min_trials = min_trials
+        self.z = z
+        self.scenarios = []
+        self.trials = []
+        self.feasible = []
+
+    def add_scenario(self, scenario):
+        """registers a scenario and returns its index"""
+        self.scenarios.append(scenario)
+        self.trials.append(0)
+        self.feasible.append([0] * self.methods)
+        return len(self.scenarios) - 1
+
+    def add(self, index, verdicts):
+        """adds the verdicts of every method for one task set"""
+        self.trials[index] += 1
+        for method, feasible in enumerate(verdicts):
+            if feasible:
+                self.feasible[index][method] += 1
+
+    def interval(self, index, method):
+        return wilson_interval(self.feasible[index][method], self.trials[index], self.z)
+
+    def converged(self, index):
+        if self.max_width is None or self.trials[index] < self.min_trials:
+            return False
+        for method in range(self.methods):
+            low, high = self.interval(index, method)
+            if high - low > self.max_width:
+                return False
+        return True
+
+    def results(self):
+        """per method, a list with one dict per scenario"""
+        per_method = tuple([] for _ in range(self.methods))
+        for index, scenario in enumerate(self.scenarios):
+            trials = self.trials[index]
+            for method in range(self.methods):
+                low, high = self.interval(index, method)
+                per_method[method].append({
+                    "utilization": scenario["utilization"],
+                    "feasibility_ratio": self.feasible[index][method] / trials if trials else 0.0,
+                    "trials": trials,
+                    "low": low,
+                    "high": high,
+                })
+        return per_method
+
+
+def write_results(path, results, methods=METHODS):
+    """writes per method results, as returned by FeasibilityAggregator.results"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"confidence": 0.95, "methods": dict(zip(methods, results))}, f, indent=1)
+
+
+def load_results(path):
+    """
+    Reads a file from write_results into the dictionary the plotting
+    scripts use: {method: {"util": [...], "feas": [...] (in %), "low": [...], "high": [...]}}
+    """
+    with open(path, encoding="utf-8") as f:
+        stored = json.load(f)
+    data = {}
+    for method, results in stored["methods"].items():
+        data[method] = {
+            "util": [r["utilization"] for r in results],
+            "feas": [r["feasibility_ratio"] * 100 for r in results],
+            "low": [r["low"] * 100 for r in results],
+            "high": [r["high"] * 100 for r in results],
+        }
+    return data
@@ -1,5 +1,3 @@
-import matplotlib.pyplot as plt
-import numpy as np
 import re
 import os
 
@@ -36,8 +34,40 @@ def read_feasibility_data(filename):
     return data
 
 
+def sweep_task_counts(filename):
+    """Números de tarefas presentes no checkpoint do sweep.py, em ordem."""
+    from sweep import read_checkpoint
+
+    return sorted({result["tasks"] for result in read_checkpoint(filename)})
+
+
+def read_sweep_results(filename, method="dm", tasks=None, seed=None):
+    """
+    Lê o checkpoint do sweep.py (JSON lines) e devolve o mesmo dicionário
+    que read_feasibility_data, sem precisar montar o dm_output.txt à mão.
+    Com tasks (ou seed), usa apenas as células com esse número de tarefas
+    (ou essa semente); sem eles, células de vários n viram pontos repetidos.
+    """
+    from sweep import read_checkpoint
+
+    data = {}
+    for result in sorted(read_checkpoint(filename), key=lambda r: (r["alpha"], r["utilization"])):
+        if tasks is not None and result["tasks"] != tasks:
+            continue
+        if seed is not None and result.get("seed") != seed:
+            continue
+        values = data.setdefault(result["alpha"], {"util": [], "feas": []})
+        values["util"].append(result["utilization"])
+        values["feas"].append(result[method] * 100)
+    return data
+
+
 def plot_feasibility(data, output_path="fig/feasibility_vs_alpha.png"):
     """Gera o gráfico de viabilidade para cada valor de alpha."""
+    # carregados só aqui, ler os dados não precisa deles
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     plt.figure(figsize=(8, 5))
 
     for alpha, values in sorted(data.items()):
@@ -69,7 +99,27 @@ def plot_feasibility(data, output_path="fig/feasibility_vs_alpha.png"):
     plt.show()
 
 
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Viabilidade do DM por valor de alpha")
+    parser.add_argument("filename", nargs="?", default="dm_output.txt",
+                        help="saída do DM por alpha, ou checkpoint .jsonl do sweep.py")
+    parser.add_argument("--tasks", type=int,
+                        help="número de tarefas do checkpoint; sem ele, um gráfico por n")
+    parser.add_argument("--seed", type=int, help="semente do sweep.py a usar do checkpoint")
+    args = parser.parse_args(argv)
+
+    if not args.filename.endswith(".jsonl"):
+        plot_feasibility(read_feasibility_data(args.filename))
+        return
+    if args.tasks is not None:
+        plot_feasibility(read_sweep_results(args.filename, tasks=args.tasks, seed=args.seed))
+        return
+    for tasks in sweep_task_counts(args.filename):
+        plot_feasibility(read_sweep_results(args.filename, tasks=tasks, seed=args.seed),
+                         f"fig/feasibility_vs_alpha_n{tasks}.png")
+
+
 if __name__ == "__main__":
-    filename = "dm_output.txt"
-    data = read_feasibility_data(filename)
-    plot_feasibility(data)
+    main()
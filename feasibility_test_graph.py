@@ -1,34 +1,10 @@
 import re
-import matplotlib
-matplotlib.use("TkAgg")  # garante que o gráfico abra no Windows
-import matplotlib.pyplot as plt
-
-# Caminho do arquivo de entrada
-input_file = "output.txt"
-
-# Dicionário para armazenar os dados
-data = {}
-current_method = None
+import sys
 
 # Expressões regulares para capturar os dados
 header_pattern = re.compile(r"-- (.*?) --")
 data_pattern = re.compile(r"Utilization:\s*([\d.]+),\s*Feasibility Ratio:\s*([\d.]+)%")
 
-# Leitura do arquivo
-with open(input_file, "r", encoding="utf-16") as f:
-    for line in f:
-        header_match = header_pattern.match(line)
-        if header_match:
-            current_method = header_match.group(1)
-            data[current_method] = {"util": [], "feas": []}
-            continue
-        data_match = data_pattern.match(line)
-        if data_match and current_method:
-            utilization = float(data_match.group(1))
-            feasibility = float(data_match.group(2))
-            data[current_method]["util"].append(utilization)
-            data[current_method]["feas"].append(feasibility)
-
 # Cores e marcadores para cada método
 colors = {"Rate Monotonic (RM)": "red",
           "Deadline Monotonic (DM)": "blue",
@@ -38,24 +14,76 @@ markers = {"Rate Monotonic (RM)": "o",
            "Deadline Monotonic (DM)": "s",
            "Earliest Deadline First (EDF)": "^"}
 
-# Gráfico único comparativo
-plt.figure(figsize=(8,6))
-for method, values in data.items():
-    plt.plot(values["util"], values["feas"], marker=markers[method], color=colors[method],
-             linestyle="-", linewidth=2, label=method)
 
-plt.xlabel("Utilization")
-plt.ylabel("Feasibility Ratio (%)")
-plt.title("Feasibility Ratio vs Utilization")
-plt.grid(True)
-plt.ylim(0, 110)
-plt.xlim(0.6, 1.05)
-plt.legend()
-plt.tight_layout()
+def read_feasibility_output(input_file):
+    """
+    Lê a saída do feasibility_tests.py (UTF-16) e devolve
+    {método: {"util": [...], "feas": [...]}}.
+    Um .json gerado com feasibility_tests.py --results é lido diretamente
+    """
+    if input_file.endswith(".json"):
+        from feasibility_stats import load_results
+        return load_results(input_file)
+
+    # Dicionário para armazenar os dados
+    data = {}
+    current_method = None
+    with open(input_file, "r", encoding="utf-16") as f:
+        for line in f:
+            header_match = header_pattern.match(line)
+            if header_match:
+                current_method = header_match.group(1)
+                data[current_method] = {"util": [], "feas": []}
+                continue
+            data_match = data_pattern.match(line)
+            if data_match and current_method:
+                utilization = float(data_match.group(1))
+                feasibility = float(data_match.group(2))
+                data[current_method]["util"].append(utilization)
+                data[current_method]["feas"].append(feasibility)
+    return data
+
+
+def plot_feasibility_comparison(data, output_path="fig/feasibility_comparison.png", show=True):
+    """Gráfico único comparativo, o matplotlib só é carregado aqui"""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8,6))
+    for method, values in data.items():
+        # métodos sem cor definida (ex.: OPA) usam as cores padrão
+        plt.plot(values["util"], values["feas"], marker=markers.get(method, "D"),
+                 color=colors.get(method), linestyle="-", linewidth=2, label=method)
+        # intervalo de confiança de 95%, só existe nos resultados em .json
+        if "low" in values:
+            plt.fill_between(values["util"], values["low"], values["high"],
+                             color=colors.get(method), alpha=0.2)
+
+    plt.xlabel("Utilization")
+    plt.ylabel("Feasibility Ratio (%)")
+    plt.title("Feasibility Ratio vs Utilization")
+    plt.grid(True)
+    plt.ylim(0, 110)
+    plt.xlim(0.6, 1.05)
+    plt.legend()
+    plt.tight_layout()
+
+    # Salvando o gráfico em um arquivo
+    plt.savefig(output_path)
+    print(f"Gráfico salvo em '{output_path}'")
+
+    if show:
+        plt.show()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Caminho do arquivo de entrada
+    input_file = argv[0] if argv else "output.txt"
 
-# Salvando o gráfico em um arquivo
-plt.savefig("fig/feasibility_comparison.png")
-print("Gráfico salvo em 'fig/feasibility_comparison.png'")
+    import matplotlib
+    matplotlib.use("TkAgg")  # garante que o gráfico abra no Windows
+    plot_feasibility_comparison(read_feasibility_output(input_file))
 
-plt.show()
 
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,34 @@
 import math
 import sys
-sys.stdout.reconfigure(encoding='utf-16')
+from itertools import accumulate
+from operator import mul
+
+import instrumentation
+from feasibility_stats import FeasibilityAggregator, write_results
+from result_cache import MISSING, ResultCache, cache_key
+
+# Importing this module has no side effects and does not load NumPy, the
+# functions which need it import it when called, so the tests can be reused
+# from other programs and worker processes start quickly
+
+# the report printed by main, feasibility_test_graph.py reads it in UTF-16
+REPORT_ENCODING = "utf-16"
+
+# versions of the tests for the result cache, bump one whenever the verdicts
+# of its test change
+TEST_VERSIONS = {"rm": 1, "dm": 4, "edf": 5}
+
+# relative tolerance of the float comparisons of the tests. The instants QPA
+# checks are computed as k*T + D, and (t - D)/T can then come out just under
+# k, which would drop the job whose deadline is exactly t. Likewise the C/T
+# of a set generated at U = 1 often sum to 1.0000000000000002
+JOB_COUNT_EPSILON = 1e-9
+
+
+def utilization_fits(utilization):
+    """U <= 1, up to the rounding of the sum of C/T"""
+    return utilization <= 1 + JOB_COUNT_EPSILON
+
 
 # ---------------------------
 # Rate Monotonic (RM)
@@ -21,182 +49,600 @@ def test_rm(tasks, num_utilization):
 # ---------------------------
 # Deadline Monotonic (DM)
 # ---------------------------
-def test_dm(tasks):
+def dm_cascade(tasks):
     """
-    Accurate feasibility test via Response Time Analysis (RTA)
-    According to Lehoczky (1990) and Audsley et al. (1991)
+    Tiered DM analysis, returns (verdict, tier) where tier names the test
+    which settled it:
+    "utilization": U > 1, infeasible under any policy
+    "liu_layland", "hyperbolic": with D_i <= T_i, DM is no worse than RM over
+    periods D_i, so Liu & Layland and the hyperbolic bound (Bini et al., 2003)
+    hold on C/D
+    "rta": exact Response Time Analysis, only for the undecided sets
     """
     # Ascending order by deadline (smaller D -> higher priority)
     tasks = sorted(tasks, key=lambda t: t["D"])
-    
-    for i, tarefa in enumerate(tasks):
-        C_i, T_i, D_i = tarefa["C"], tarefa["T"], tarefa["D"]
-        R_i = C_i
-        while True:
-            R_prev = R_i
-            interferencia = sum(
-                math.ceil(R_i / tasks[j]["T"]) * tasks[j]["C"]
-                for j in range(i)
-            )
-            R_i = C_i + interferencia
-            if R_i == R_prev:
-                break
-            if R_i > D_i:
-                # TODO: Add toggle for detailed output
-                # Detailed output
-                # print(f"[DM] Task {i+1} failed: R_i={R_i:.4f} > D_i={D_i}")
-                return False
-        # TODO: Add toggle for detailed output
-        # Detailed output
-        # print(f"[DM] Task {i+1}: R_i={R_i:.4f}, D_i={D_i}")
-        if R_i > D_i:
+    C = [t["C"] for t in tasks]
+    T = [t["T"] for t in tasks]
+    D = [t["D"] for t in tasks]
+    n = len(tasks)
+
+    # Necessary condition
+    if not utilization_fits(sum(c / t for c, t in zip(C, T))):
+        return False, "utilization"
+
+    if all(d <= t for d, t in zip(D, T)):
+        density = [c / d for c, d in zip(C, D)]
+        if sum(density) <= n * (2 ** (1 / n) - 1):
+            return True, "liu_layland"
+        if math.prod(u + 1 for u in density) <= 2:
+            return True, "hyperbolic"
+
+    return response_time_analysis(C, T, D), "rta"
+
+
+# from this many higher priority tasks on, response_time works on NumPy
+# columns, below it plain Python is faster
+RTA_NUMPY_TASKS = 128
+
+
+def response_time(C_i, D_i, C_hp, T_hp, start):
+    """
+    Least fixed point of R = C_i + sum(ceil(R / T_j) * C_j) over the higher
+    priority tasks C_hp/T_hp, None once it passes D_i.
+    start is a lower bound of it, such as R_(i-1) + C_i (Davis et al., 2008).
+    It is lowered by a relative JOB_COUNT_EPSILON, so rounding can't put it
+    past the fixed point and the result is the one iterating from C_i gives.
+    The interference is kept as running prefix sums, added left to right
+    like the original test_dm: after a step, only the prefix from the first
+    task whose job count changed is summed again
+    """
+    if len(C_hp) == 0:
+        return C_i if C_i <= D_i else None
+    if len(C_hp) >= RTA_NUMPY_TASKS:
+        return _response_time_columns(C_i, D_i, C_hp, T_hp, start)
+    R = max(C_i, start * (1 - JOB_COUNT_EPSILON))
+    jobs = [math.ceil(R / T_j) for T_j in T_hp]
+    prefix = list(accumulate(map(mul, jobs, C_hp)))
+    iterations = 1
+    while True:
+        R_next = C_i + prefix[-1]
+        if R_next == R:
+            break
+        if R_next > D_i:
+            # TODO: Add toggle for detailed output
+            # Detailed output
+            # print(f"[DM] failed: R_i={R_next:.4f} > D_i={D_i}")
+            instrumentation.count("rta_iterations", iterations)
+            return None
+        R = R_next
+        iterations += 1
+        counts = [math.ceil(R / T_j) for T_j in T_hp]
+        if counts != jobs:
+            first = next(j for j, (new, old) in enumerate(zip(counts, jobs)) if new != old)
+            jobs = counts
+            head = prefix[first - 1] if first else 0
+            prefix[first:] = accumulate(map(mul, jobs[first:], C_hp[first:]), initial=head)
+            del prefix[first]
+    instrumentation.count("rta_iterations", iterations)
+    return R if R <= D_i else None
+
+
+def _response_time_columns(C_i, D_i, C_hp, T_hp, start):
+    """response_time on NumPy columns, the same sums in the same order"""
+    import numpy as np
+
+    C_hp = np.asarray(C_hp, dtype=float)
+    T_hp = np.asarray(T_hp, dtype=float)
+    R = max(C_i, start * (1 - JOB_COUNT_EPSILON))
+    jobs = np.zeros(len(C_hp))
+    prefix = np.zeros(len(C_hp))
+    iterations = 0
+    while True:
+        iterations += 1
+        counts = np.ceil(R / T_hp)
+        changed = np.flatnonzero(counts != jobs)
+        if changed.size:
+            first = changed[0]
+            jobs[first:] = counts[first:]
+            head = prefix[first - 1] if first else 0.0
+            # accumulate adds one term at a time, unlike sum
+            prefix[first:] = np.add.accumulate(
+                np.concatenate(([head], jobs[first:] * C_hp[first:])))[1:]
+        R_next = float(C_i + prefix[-1])
+        if R_next == R:
+            break
+        if R_next > D_i:
+            instrumentation.count("rta_iterations", iterations)
+            return None
+        R = R_next
+    instrumentation.count("rta_iterations", iterations)
+    return R if R <= D_i else None
+
+
+def response_time_analysis(C, T, D):
+    """
+    Exact RTA over C/T/D columns already in priority order, every fixed
+    point warm started from R_(i-1) + C_i, see response_time
+    """
+    R_i = 0
+    for i in range(len(C)):
+        R_i = response_time(C[i], D[i], C[:i], T[:i], R_i + C[i])
+        if R_i is None:
             return False
     return True
 
 
+def test_dm(tasks):
+    """
+    Accurate feasibility test via Response Time Analysis (RTA)
+    According to Lehoczky (1990) and Audsley et al. (1991)
+    Cheap bounds are tried first, see dm_cascade
+    """
+    return dm_cascade(tasks)[0]
+
+
+def jobs_due(t, T, D):
+    """number of jobs of a task with an absolute deadline at or before t"""
+    x = (t - D) / T
+    return max(0, math.floor(x + JOB_COUNT_EPSILON * max(1.0, abs(x))) + 1)
+
+
 def dbf(task, t):
     """demand bound function from a task for instants t"""
-    C, T, D = task["C"], task["T"], task["D"]
-    n_jobs = max(0, math.floor((t - D)/T) + 1)
-    return n_jobs * C
+    return jobs_due(t, task["T"], task["D"]) * task["C"]
 
-def test_edf(tasks, num_utilization):
-    if tasks[0]["D"] == tasks[0]["T"]:
-        return num_utilization <= 1.0
-    
-    # possible deadlines for critical instant
-    deadlines = set()
+def demand(tasks, t):
+    """total demand bound function h(t) of a task set"""
+    return sum(dbf(task, t) for task in tasks)
+
+
+def last_deadline_before(tasks, t):
+    """largest absolute deadline strictly smaller than t, None if there is none"""
+    latest = None
     for task in tasks:
-        k_max = math.ceil(max(t["T"] for t in tasks) / task["T"])
-        for k in range(k_max+1):
-            deadlines.add(k * task["T"] + task["D"])
-    deadlines = sorted(deadlines)
+        if task["D"] < t:
+            # jobs with a deadline at or after t, with the tolerance of jobs_due
+            x = (t - task["D"]) / task["T"]
+            k = math.ceil(x - JOB_COUNT_EPSILON * max(1.0, abs(x))) - 1
+            deadline = k * task["T"] + task["D"]
+            if latest is None or deadline > latest:
+                latest = deadline
+    return latest
+
+
+def edf_horizon(tasks, utilization):
+    """
+    Upper bound L of the instants that must be checked for EDF.
+    min(L_a, L_b) where L_a is the bound by Baruah et al. (1990)
+    max(D_max, sum((T_i - D_i) * U_i) / (1 - U)) for U < 1,
+    and L_b the length of the synchronous busy period (Spuri, 1996)
+    """
+    L_a = math.inf
+    if utilization < 1:
+        L_a = max(max(task["D"] for task in tasks),
+                  sum((task["T"] - task["D"]) * task["C"] / task["T"] for task in tasks)
+                  / (1 - utilization))
+
+    # busy period: w = sum(ceil(w / T_i) * C_i), stopped once it passes L_a
+    w = sum(task["C"] for task in tasks)
+    while w < L_a:
+        w_next = sum(math.ceil(w / task["T"]) * task["C"] for task in tasks)
+        if w_next == w:
+            break
+        w = w_next
+    return min(L_a, w)
+
 
-    for t in deadlines:
-        load = sum(dbf(task, t) for task in tasks)
+def edf_cascade(tasks, num_utilization):
+    """
+    Tiered EDF analysis, returns (verdict, tier) where tier names the test
+    which settled it:
+    "implicit": implicit deadlines, U <= 1 is exact
+    "utilization": U > 1 is infeasible
+    "density": sum(C_i / min(D_i, T_i)) <= 1 is sufficient
+    "qpa": exact processor demand analysis, only for the undecided sets
+    U is computed from the tasks, num_utilization (the scenario target) is
+    only kept so test_edf has the same arguments as test_rm
+    """
+    utilization = sum(task["C"] / task["T"] for task in tasks)
+    if all(task["D"] == task["T"] for task in tasks):
+        return utilization_fits(utilization), "implicit"
+
+    if not utilization_fits(utilization):
+        return False, "utilization"
+
+    if sum(task["C"] / min(task["D"], task["T"]) for task in tasks) <= 1:
+        return True, "density"
+
+    return quick_processor_demand_analysis(tasks, utilization), "qpa"
+
+
+def quick_processor_demand_analysis(tasks, utilization, lower=0):
+    """
+    Exact processor demand test for EDF using Quick Processor-demand
+    Analysis (QPA) by Zhang & Burns (2009), for U <= 1.
+    Instead of every deadline up to L, it walks backwards from the last
+    deadline before L and jumps straight to h(t) whenever h(t) < t.
+    Instants before lower are taken as already checked: after adding a task
+    with deadline D to a feasible set, h(t) only changes from t = D on
+    """
+    d_min = min(task["D"] for task in tasks)
+    L = edf_horizon(tasks, utilization)
+    # the last deadline which is not bigger than L
+    t = last_deadline_before(tasks, math.nextafter(L, math.inf))
+
+    instants = 0
+    feasible = True
+    while t is not None and t >= lower:
+        instants += 1
+        load = demand(tasks, t)
         if load > t:
             # TODO: Add toggle for detailed output
             # Detailed output
             # print(f"❌ Failed: load={load:.2f} > instant={t}")
-            return False
-    return True
+            feasible = False
+            break
+        if load <= d_min:
+            break
+        if load < t:
+            t = load
+        else:
+            t = last_deadline_before(tasks, t)
+    instrumentation.count("dbf_instants", instants)
+    return feasible
 
 
-def load_tasks_from_file(filename):
+def test_edf(tasks, num_utilization):
+    """
+    Exact feasibility test for EDF, cheap bounds are tried before the
+    processor demand analysis, see edf_cascade
     """
-    Reads a file structured as:
+    return edf_cascade(tasks, num_utilization)[0]
+
+
+def _non_empty_lines(f):
+    """yields (line number, stripped line) ignoring empty lines"""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def iter_task_sets(filename):
+    """
+    Streams a file structured as:
     <total task set> <total tasks per set> <utilization>
     Task Set : <task set number>
-    <C> <T>
+    <C> <T> <D>
     ...
+    yielding (scenario, tasks) one task set at a time, so memory does not
+    grow with the file. scenario is the header as a dict and is the same
+    object for every task set of that scenario
     """
-    scenarios = []
-
     with open(filename, 'r', encoding='utf-8') as f:
-        lines = [l.strip() for l in f if l.strip()]  # ignore empty lines
-
-    i = 0
-    while i < len(lines):
-        # Scenario header
-        partes = lines[i].split()
-        if len(partes) != 3:
-            raise ValueError(f"Format error on line {i+1}: {lines[i]}")
-        total_task_sets = int(partes[0])
-        tasks_per_set = int(partes[1])
-        utilization = float(partes[2])
-        i += 1
-
-        scenario = {
-            "utilization": utilization,
-            "total_task_sets": total_task_sets,
-            "tasks_per_set": tasks_per_set,
-            "task_sets": []
-        }
-
-        # Read each task set
-        for _ in range(total_task_sets):
-            if not lines[i].startswith("Task Set"):
-                raise ValueError(f"Expected 'Task Set' on line {i+1}, found: {lines[i]}")
-            i += 1
-
-            tasks = []
-            for _ in range(tasks_per_set):
-                if i >= len(lines):
-                    raise ValueError("End of file. Success.")
-                c, t, d = map(float, lines[i].split())
-                tasks.append({"C": c, "T": t, "D": d}) # Execution time, Period, Deadline
-                i += 1
-
-            scenario["task_sets"].append(tasks)
-
-        scenarios.append(scenario)
+        lines = _non_empty_lines(f)
+        for line_number, line in lines:
+            # Scenario header
+            partes = line.split()
+            if len(partes) != 3:
+                raise ValueError(f"Format error on line {line_number}: {line}")
+            scenario = {
+                "utilization": float(partes[2]),
+                "total_task_sets": int(partes[0]),
+                "tasks_per_set": int(partes[1]),
+            }
+
+            # Read each task set
+            for _ in range(scenario["total_task_sets"]):
+                line_number, line = next(lines, (None, ""))
+                if not line.startswith("Task Set"):
+                    raise ValueError(f"Expected 'Task Set' on line {line_number}, found: {line}")
+
+                tasks = []
+                for _ in range(scenario["tasks_per_set"]):
+                    line_number, line = next(lines, (None, None))
+                    if line is None:
+                        raise ValueError("End of file. Success.")
+                    c, t, d = map(float, line.split())
+                    tasks.append({"C": c, "T": t, "D": d}) # Execution time, Period, Deadline
+
+                yield scenario, tasks
+
+
+def iter_task_set_batches(filename, batch_size):
+    """
+    Streams the same file as iter_task_sets in batches of at most batch_size
+    task sets, yielding (scenario, C, T, D) with (batch, tasks per set)
+    NumPy arrays. A batch never mixes two scenarios
+    """
+    import numpy as np
+
+    batch_scenario = None
+    batch = []
+    for scenario, tasks in iter_task_sets(filename):
+        if batch and (scenario is not batch_scenario or len(batch) == batch_size):
+            yield (batch_scenario, *np.array(batch).transpose(2, 0, 1))
+            batch = []
+        batch_scenario = scenario
+        batch.append([(task["C"], task["T"], task["D"]) for task in tasks])
+    if batch:
+        yield (batch_scenario, *np.array(batch).transpose(2, 0, 1))
+
 
+def load_tasks_from_file(filename):
+    """
+    Reads the whole file into a list of scenarios, each one with its
+    "task_sets" list. Prefer iter_task_sets for big files
+    """
+    scenarios = []
+    current = None
+    for scenario, tasks in iter_task_sets(filename):
+        if scenario is not current:
+            current = scenario
+            scenarios.append({**scenario, "task_sets": []})
+        scenarios[-1]["task_sets"].append(tasks)
     return scenarios
 
+
+def iter_scenarios_task_sets(scenarios):
+    """turns load_tasks_from_file output into (scenario, tasks) pairs"""
+    for scenario in scenarios:
+        for tasks in scenario["task_sets"]:
+            yield scenario, tasks
+
+def task_sets_from_arrays(C, T, D):
+    """
+    Yields task sets from (N, n) arrays, such as the ones returned by
+    uunifast.uunifastsBatch, in the same format as load_tasks_from_file
+    """
+    for c, t, d in zip(C.tolist(), T.tolist(), D.tolist()):
+        yield [{"C": c_i, "T": t_i, "D": d_i} for c_i, t_i, d_i in zip(c, t, d)]
+
+def evaluate_task_set(job):
+    """
+    Runs RM, DM and EDF over one task set.
+    job is (scenario index, tasks, utilization) so results coming back from
+    a process pool can be attributed to their scenario. Last comes a dict
+    with the tiers which settled DM and EDF, see dm_cascade and edf_cascade,
+    and the profiling record of the task set when instrumentation is on
+    """
+    b_idx, tasks, utilization = job
+    if instrumentation.ENABLED:
+        instrumentation.begin("feasibility", scenario=b_idx,
+                              utilization=utilization, tasks=len(tasks))
+    rm_feasible = test_rm(tasks, utilization) if tasks[0]["D"] == tasks[0]["T"] else False
+    dm_feasible, dm_tier = dm_cascade(tasks)
+    edf_feasible, edf_tier = edf_cascade(tasks, utilization)
+    # TODO: Add toggle for detailed output
+    # Detailed output
+    # print(f"Tasks: {tasks}")
+    # print("RM:", "✅ Viable" if rm_feasible else "❌ Not Viable")
+    # print("DM:", "✅ Viable" if dm_feasible else "❌ Not Viable")
+    # print("EDF:", "✅ Viable" if edf_feasible else "❌ Not Viable")
+    details = {"dm_tier": dm_tier, "edf_tier": edf_tier, "profile": None}
+    if instrumentation.ENABLED:
+        profile = instrumentation.end()
+        profile["dm_tier"] = dm_tier
+        profile["edf_tier"] = edf_tier
+        details["profile"] = profile
+    return b_idx, rm_feasible, dm_feasible, edf_feasible, details
+
+
+def _cache_keys(tasks, utilization):
+    return [cache_key(tasks, name, TEST_VERSIONS[name], utilization)
+            for name in ("rm", "dm", "edf")]
+
+
+def run_feasibility_tests(task_sets, workers=1, chunksize=64, cache=None, tier_hits=None,
+                          stop_width=None, stop_check=100):
+    """
+    Runs the tests over a stream of (scenario, tasks) pairs, as given by
+    iter_task_sets, and returns the RM, DM and EDF feasibility ratios per
+    utilization, each with its number of trials and Wilson interval.
+    With workers > 1 task sets are sharded across a process pool in chunks
+    of chunksize; results are only counted, so the output does not depend
+    on the number of workers. The stream is fed to the pool a window at a
+    time so memory stays flat.
+    With a ResultCache, task sets already tested are not tested again.
+    tier_hits, a collections.Counter, gets how many task sets each tier of
+    the DM and EDF cascades settled, as ("dm", tier) and ("edf", tier) keys;
+    cached task sets are counted under the "cache" tier.
+    With stop_width, every stop_check task sets of a scenario its intervals
+    are checked and the rest of the scenario is skipped once all of them are
+    at most stop_width wide. The check always sees the same results, so
+    early stopping does not depend on the number of workers either
+    """
+    aggregator = FeasibilityAggregator(max_width=stop_width)
+    # yielded by jobs() where the results so far must be counted
+    check = object()
+
+    def jobs():
+        current = None
+        for scenario, tasks in task_sets:
+            if scenario is not current:
+                current = scenario
+                b_idx = aggregator.add_scenario(scenario)
+                seen = 0
+                stopped = False
+            if stopped:
+                continue
+            if stop_width is not None and seen and seen % stop_check == 0:
+                yield check
+                if aggregator.converged(b_idx):
+                    stopped = True
+                    continue
+            seen += 1
+            if cache is not None:
+                verdicts = [cache.get(key) for key in _cache_keys(tasks, scenario["utilization"])]
+                if MISSING not in verdicts:
+                    aggregator.add(b_idx, verdicts)
+                    if tier_hits is not None:
+                        tier_hits["dm", "cache"] += 1
+                        tier_hits["edf", "cache"] += 1
+                    continue
+            yield b_idx, tasks, scenario["utilization"]
+
+    def record(job, result):
+        b_idx, *verdicts, details = result
+        aggregator.add(b_idx, verdicts)
+        if tier_hits is not None:
+            tier_hits["dm", details["dm_tier"]] += 1
+            tier_hits["edf", details["edf_tier"]] += 1
+        if details["profile"] is not None:
+            instrumentation.add(details["profile"])
+        if cache is not None:
+            for key, feasible in zip(_cache_keys(job[1], job[2]), verdicts):
+                cache.put(key, feasible)
+
+    if workers > 1:
+        from multiprocessing import Pool
+
+        pending = jobs()
+        window = workers * chunksize * 4
+        exhausted = False
+        with Pool(workers, instrumentation.enable, (instrumentation.ENABLED,)) as pool:
+            while not exhausted:
+                batch = []
+                for job in pending:
+                    if job is check:
+                        break
+                    batch.append(job)
+                    if len(batch) == window:
+                        break
+                else:
+                    exhausted = True
+                for job, result in zip(batch, pool.imap(evaluate_task_set, batch, chunksize)):
+                    record(job, result)
+    else:
+        for job in jobs():
+            if job is not check:
+                record(job, evaluate_task_set(job))
+
+    # Statistic output
+    return aggregator.results()
+
+
+def run_feasibility_tests_batched(batches):
+    """
+    Same results as run_feasibility_tests, from (scenario, C, T, D) batches
+    as given by iter_task_set_batches, tested a whole batch at a time with
+    the kernels of feasibility_batch
+    """
+    from feasibility_batch import evaluate_batch
+
+    aggregator = FeasibilityAggregator()
+    current = None
+    for scenario, C, T, D in batches:
+        if scenario is not current:
+            current = scenario
+            b_idx = aggregator.add_scenario(scenario)
+        for verdicts in zip(*evaluate_batch(C, T, D, scenario["utilization"])):
+            aggregator.add(b_idx, verdicts)
+    return aggregator.results()
+
+def use_report_encoding():
+    """switches stdout to REPORT_ENCODING, feasibility_test_graph.py reads the report in it"""
+    sys.stdout.reconfigure(encoding=REPORT_ENCODING)
+
+
+def print_report(sections):
+    """
+    prints (title, [(utilization, ratio), ...]) sections in the layout
+    feasibility_test_graph.py reads
+    """
+    for index, (title, points) in enumerate(sections):
+        print(("\n" if index else "") + f"-- {title} --")
+        for utilization, ratio in points:
+            print(f"Utilization: {utilization}, Feasibility Ratio: {ratio:.2%}")
+
+
+def print_feasibility_ratios(rm_ratios, dm_ratios, edf_ratios):
+    """prints the summary that feasibility_test_graph.py reads"""
+    print_report([(title, [(result["utilization"], result["feasibility_ratio"]) for result in ratios])
+                  for title, ratios in (("Rate Monotonic (RM)", rm_ratios),
+                                        ("Deadline Monotonic (DM)", dm_ratios),
+                                        ("Earliest Deadline First (EDF)", edf_ratios))])
+
 # --------------------------------
 # Main program
 # --------------------------------
-if __name__ == "__main__":
-    filename = "task_list.txt"
-    scenarios = load_tasks_from_file(filename)
-
-    rm_feasible_percentage_per_scenario = []
-    dm_feasible_percentage_per_scenario = []
-    edf_feasible_percentage_per_scenario = []
-
-    for b_idx, scenario in enumerate(scenarios, 1):
-        # TODO: Add toggle for detailed output
-        # Detailed output
-        # print(f"\n=== Scenario {b_idx} | Utilization = {scenario['utilization']} ===")
-
-        rm_feasible_count = 0
-        dm_feasible_count = 0
-        edf_feasible_count = 0
-
-        for ts_idx, tasks in enumerate(scenario["task_sets"], 1):
-            rm_feasible = test_rm(tasks, scenario['utilization']) if tasks[0]["D"] == tasks[0]["T"] else False
-            dm_feasible = test_dm(tasks)
-            edf_feasible = test_edf(tasks, scenario['utilization'])
-
-            if rm_feasible:
-                rm_feasible_count += 1
-            if dm_feasible:
-                dm_feasible_count += 1
-            if edf_feasible:
-                edf_feasible_count += 1
-            
-            # TODO: Add toggle for detailed output
-            # Detailed output
-            # print(f"\n=== Task Set {ts_idx} ===")
-            # print(f"Tasks: {tasks}")
-            # print("RM:", "✅ Viable" if rm_feasible else "❌ Not Viable")
-            # print("DM:", "✅ Viable" if dm_feasible else "❌ Not Viable")
-            # print("EDF:", "✅ Viable" if edf_feasible else "❌ Not Viable")
-
-        # Statistic output
-        rm_feasible_percentage_per_scenario.append(
-            {"utilization": scenario["utilization"],
-             "feasibility_ratio": rm_feasible_count / scenario["total_task_sets"]})
-        dm_feasible_percentage_per_scenario.append(
-            {"utilization": scenario["utilization"],
-            "feasibility_ratio": dm_feasible_count / scenario["total_task_sets"]})
-        edf_feasible_percentage_per_scenario.append(
-            {"utilization": scenario["utilization"],
-            "feasibility_ratio": edf_feasible_count / scenario["total_task_sets"]})
-    
-    # print("\n=== Summary of Feasibility Percentages ===\n")
-
-    print("-- Rate Monotonic (RM) --")
-    for result in rm_feasible_percentage_per_scenario:
-        print(f"Utilization: {result['utilization']}, Feasibility Ratio: {result['feasibility_ratio']:.2%}")
-    
-    print("\n-- Deadline Monotonic (DM) --")
-    for result in dm_feasible_percentage_per_scenario:
-        print(f"Utilization: {result['utilization']}, Feasibility Ratio: {result['feasibility_ratio']:.2%}")
-    
-    print("\n-- Earliest Deadline First (EDF) --")
-    for result in edf_feasible_percentage_per_scenario:
-        print(f"Utilization: {result['utilization']}, Feasibility Ratio: {result['feasibility_ratio']:.2%}")
+def main(argv=None):
+    import argparse
+    from collections import Counter
 
+    parser = argparse.ArgumentParser(description="RM, DM and EDF feasibility tests")
+    parser.add_argument("filename", nargs="?", default="task_list.txt",
+                        help="text task list, or a binary one ending in .bin")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes, 1 runs serially")
+    parser.add_argument("--chunk-size", type=int, default=64,
+                        help="task sets handed to a worker at a time")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="reuse verdicts stored in this cache file")
+    parser.add_argument("--cache-size", type=int, default=1_000_000,
+                        help="maximum number of cached verdicts")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record time and work per task set into a .json or .csv file")
+    parser.add_argument("--results", metavar="PATH",
+                        help="also write ratios and confidence intervals as JSON for the plots")
+    parser.add_argument("--stop-width", type=float,
+                        help="stop a scenario once every 95%% interval is at most this wide")
+    parser.add_argument("--stop-check", type=int, default=100,
+                        help="task sets between two early stopping checks")
+    parser.add_argument("--tier-stats", action="store_true",
+                        help="print to stderr how many task sets each analysis tier settled")
+    parser.add_argument("--batch-size", type=int,
+                        help="test this many task sets at a time with the NumPy kernels")
+    args = parser.parse_args(argv)
+    use_report_encoding()
+    if args.batch_size and (args.workers > 1 or args.cache or args.profile
+                            or args.stop_width or args.tier_stats):
+        parser.error("--batch-size can't be combined with --workers, --cache, --profile, "
+                     "--stop-width or --tier-stats")
 
+    if args.filename.endswith(".bin"):
+        from binary_task_list import BinaryTaskList
+        task_list = BinaryTaskList(args.filename)
+        task_sets = task_list.iter_task_sets()
+        if args.batch_size:
+            task_sets = task_list.iter_batches(args.batch_size)
+    elif args.batch_size:
+        task_sets = iter_task_set_batches(args.filename, args.batch_size)
+    else:
+        task_sets = iter_task_sets(args.filename)
 
+    cache = ResultCache(args.cache, args.cache_size) if args.cache else None
+    instrumentation.enable(bool(args.profile))
+    tier_hits = Counter() if args.tier_stats else None
+
+    (rm_feasible_percentage_per_scenario,
+     dm_feasible_percentage_per_scenario,
+     edf_feasible_percentage_per_scenario) = (
+        run_feasibility_tests_batched(task_sets) if args.batch_size else
+        run_feasibility_tests(task_sets, args.workers, args.chunk_size, cache, tier_hits,
+                              args.stop_width, args.stop_check))
+
+    if cache is not None:
+        cache.close()
+    if args.profile:
+        instrumentation.export(args.profile)
+    if args.results:
+        write_results(args.results, (rm_feasible_percentage_per_scenario,
+                                     dm_feasible_percentage_per_scenario,
+                                     edf_feasible_percentage_per_scenario))
+
+    print_feasibility_ratios(rm_feasible_percentage_per_scenario,
+                             dm_feasible_percentage_per_scenario,
+                             edf_feasible_percentage_per_scenario)
+
+    if tier_hits is not None:
+        for test in ("dm", "edf"):
+            total = sum(hits for (name, _), hits in tier_hits.items() if name == test)
+            print(f"[{test.upper()}] tiers:", file=sys.stderr)
+            for (name, tier), hits in sorted(tier_hits.items()):
+                if name == test:
+                    print(f"  {tier}: {hits} ({hits / total:.2%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Hyperperiod analysis
+# exact hyperperiods, how expensive a simulation is going to be before
+# running it, and period choices that keep the hyperperiod small
+
+from fractions import Fraction
+from math import gcd, lcm
+
+# periods of generateTaskFromUtilization go from 2 to 10 (LCM 2520)
+MIN_PERIOD = 2
+MAX_PERIOD = 10
+# hyperperiod used by the "divisor" mode, its divisors in [2, 10] are
+# 2, 3, 4, 5, 6, 8 and 10
+DIVISOR_HYPERPERIOD = 120
+
+PERIOD_MODES = ("uniform", "harmonic", "divisor")
+
+
+def hyperPeriod(periods):
+    # exact LCM of the periods, never goes through floats
+    # float periods are read as the fractions they represent, the LCM of
+    # fractions is LCM(numerators) / GCD(denominators)
+    fractions = [Fraction(p) for p in periods]
+    numerator = lcm(*[f.numerator for f in fractions])
+    denominator = gcd(*[f.denominator for f in fractions])
+    if denominator == 1:
+        return numerator
+    return Fraction(numerator, denominator)
+
+
+def simulationCost(periods):
+    # what simulating one hyperperiod costs: the tick loop runs one step
+    # per time unit, the event driven one about two events per job
+    H = hyperPeriod(periods)
+    jobs = sum(H // Fraction(p) for p in periods)
+    return {"hyperPeriod": H, "ticks": H, "jobs": jobs, "events": 2 * jobs}
+
+
+def busyPeriod(periods, executions):
+    # length of the synchronous busy period: every task releases a job at 0
+    # and the processor stays busy until w = sum(ceil(w / T_i) * C_i).
+    # For synchronous releases and deadlines up to the periods, EDF and
+    # fixed priorities miss a deadline in the whole hyperperiod only if they
+    # miss one in there, so it is enough to simulate this long.
+    # Never longer than the hyperperiod, which is returned as well when the
+    # utilization is above 1 and the busy period never ends
+    H = hyperPeriod(periods)
+    # exact, a float sum just above 1 would never converge
+    if sum(Fraction(e) / Fraction(p) for p, e in zip(periods, executions)) > 1:
+        return H
+    w = sum(executions)
+    while w < H:
+        # ceil(w / p) without going through a float division
+        w_next = sum(-(-w // p) * e for p, e in zip(periods, executions))
+        if w_next == w:
+            break
+        w = w_next
+    return min(w, H)
+
+
+def divisors(number):
+    return [d for d in range(1, number + 1) if number % d == 0]
+
+
+def periodChoices(mode="uniform", minPeriod=MIN_PERIOD, maxPeriod=MAX_PERIOD,
+                  hyperPeriodBound=DIVISOR_HYPERPERIOD):
+    # periods a task can get in each mode
+    # uniform: every integer in [minPeriod, maxPeriod]
+    # harmonic: minPeriod * 2^k, every period divides the bigger ones so
+    #           the hyperperiod is the biggest period
+    # divisor: divisors of hyperPeriodBound, which bounds the hyperperiod
+    if mode == "uniform":
+        return list(range(minPeriod, maxPeriod + 1))
+    if mode == "harmonic":
+        choices = []
+        p = minPeriod
+        while p <= maxPeriod:
+            choices.append(p)
+            p *= 2
+        return choices
+    if mode == "divisor":
+        choices = [d for d in divisors(hyperPeriodBound) if minPeriod <= d <= maxPeriod]
+        if not choices:
+            raise ValueError(f"{hyperPeriodBound} has no divisor between {minPeriod} and {maxPeriod}")
+        return choices
+    raise ValueError(f"Unknown period mode {mode}, expected one of {PERIOD_MODES}")
+
+
+def maxHyperPeriod(mode="uniform", minPeriod=MIN_PERIOD, maxPeriod=MAX_PERIOD,
+                   hyperPeriodBound=DIVISOR_HYPERPERIOD):
+    # worst hyperperiod a task set generated with this mode can have
+    return hyperPeriod(periodChoices(mode, minPeriod, maxPeriod, hyperPeriodBound))
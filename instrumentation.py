@@ -0,0 +1,103 @@
+import json
+import time
+from contextlib import contextmanager
+
+# Optional profiling of the scheduler and the test pipeline
+# Every task set gets a record with its wall time and whatever counters the
+# code running for it reported (RTA iterations, dbf check instants,
+# simulated ticks/events, hyperperiod...). Nothing is recorded until
+# enable() is called, so the counters cost a flag check when it's off
+
+ENABLED = False
+
+_records = []
+_current = None
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    global _current
+    _records.clear()
+    _current = None
+
+
+def begin(stage, **fields):
+    """starts the record of one task set, counters go to it until end()"""
+    global _current
+    _current = {"stage": stage, **fields}
+    _current["_start"] = time.perf_counter()
+    return _current
+
+
+def end():
+    """closes the current record and returns it without keeping it"""
+    global _current
+    record = _current
+    _current = None
+    record["wall_time"] = time.perf_counter() - record.pop("_start")
+    return record
+
+
+def add(record):
+    """keeps a record, such as one sent back by a worker process"""
+    _records.append(record)
+
+
+@contextmanager
+def measure(stage, **fields):
+    """records the block as one task set when profiling is enabled"""
+    if not ENABLED:
+        yield None
+        return
+    record = begin(stage, **fields)
+    try:
+        yield record
+    finally:
+        add(end())
+
+
+def count(name, amount=1):
+    """adds amount to a counter of the current record"""
+    if ENABLED and _current is not None:
+        _current[name] = _current.get(name, 0) + amount
+
+
+def set_value(name, value):
+    """stores a value, such as the hyperperiod, in the current record"""
+    if ENABLED and _current is not None:
+        _current[name] = value
+
+
+def records():
+    return list(_records)
+
+
+def export_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_records, f, indent=1)
+
+
+def export_csv(path):
+    import csv
+
+    columns = []
+    for record in _records:
+        for key in record:
+            if key not in columns:
+                columns.append(key)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(_records)
+
+
+def export(path):
+    """writes the records as CSV when path ends in .csv, JSON otherwise"""
+    if path.endswith(".csv"):
+        export_csv(path)
+    else:
+        export_json(path)
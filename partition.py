@@ -0,0 +1,229 @@
+import argparse
+import math
+from bisect import bisect_right
+
+from feasibility_tests import (iter_task_sets, test_rm, quick_processor_demand_analysis,
+                               response_time, utilization_fits)
+
+# Partitioned multiprocessor scheduling
+# Every task is bound to one core and each core is scheduled on its own, so
+# the uniprocessor tests of feasibility_tests.py are the admission tests of a
+# core. Tasks are placed by decreasing utilization with first fit, best fit
+# (the fullest core that admits the task) or worst fit (the emptiest one),
+# opening a new core only when no open core admits the task, which gives the
+# number of cores the heuristic needs for a task set.
+# Each core keeps what it knows about its tasks (utilization, density,
+# hyperbolic product and, for DM, the response times in priority order), so
+# an admission attempt is O(1) when a bound settles it and otherwise only
+# updates the response times the new task can change
+
+POLICIES = ("rm", "dm", "edf")
+HEURISTICS = ("ffd", "bfd", "wfd")
+
+
+class Core:
+    """
+    Tasks of one core and the state of its admission test.
+    Tasks can also be removed, which admission.py uses to keep a running
+    task set
+    """
+
+    def __init__(self, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        self.policy = policy
+        self.tasks = []
+        self.utilization = 0.0
+        self.density = 0.0
+        self.hyperbolic = 1.0
+        self.implicit = True
+        # DM: tasks and their columns in priority order (by D, ties by
+        # arrival like the stable sort of test_dm) and their response times,
+        # None once a bound admitted a task without computing them
+        self.order = []
+        self.C, self.T, self.D = [], [], []
+        self.R = []
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def _response_times(self, start=0):
+        """response times from priority position start on, the ones before are kept"""
+        R = self.R[:start] if start else []
+        previous = R[-1] if R else 0
+        for i in range(start, len(self.C)):
+            previous = response_time(self.C[i], self.D[i], self.C[:i], self.T[:i],
+                                     previous + self.C[i])
+            R.append(previous)
+        return R
+
+    def _admit_dm(self, task, n):
+        C, T, D = task["C"], task["T"], task["D"]
+        constrained = D <= T and all(d <= t for d, t in zip(self.D, self.T))
+        if constrained:
+            if self.density + C / D <= n * (2 ** (1 / n) - 1):
+                return True, "liu_layland", None
+            if self.hyperbolic * (C / D + 1) <= 2:
+                return True, "hyperbolic", None
+        if self.R is None:
+            self.R = self._response_times()
+        position = bisect_right(self.D, D)
+        R = self.R[:position]
+        # warm start R_(i-1) + C_i as in response_time_analysis
+        R_new = response_time(C, D, self.C[:position], self.T[:position],
+                              (R[-1] if R else 0) + C)
+        if R_new is None:
+            return False, "rta", None
+        R.append(R_new)
+        C_hp = self.C[:position] + [C]
+        T_hp = self.T[:position] + [T]
+        for i in range(position, len(self.C)):
+            # the new task adds at least C to every lower priority response time
+            R_i = response_time(self.C[i], self.D[i], C_hp, T_hp, self.R[i] + C)
+            if R_i is None:
+                return False, "rta", None
+            R.append(R_i)
+            C_hp.append(self.C[i])
+            T_hp.append(self.T[i])
+        return True, "rta", R
+
+    def admission(self, task):
+        """
+        (admitted, tier, response times) of the core with task added,
+        without adding it. tier names the test which decided, as in
+        dm_cascade and edf_cascade
+        """
+        n = len(self.tasks) + 1
+        utilization = self.utilization + task["C"] / task["T"]
+        implicit = self.implicit and task["D"] == task["T"]
+        if not utilization_fits(utilization):
+            return False, "utilization", None
+        if self.policy == "rm":
+            return test_rm(self.tasks + [task], utilization), "liu_layland", None
+        if self.policy == "dm":
+            return self._admit_dm(task, n)
+        # same tiers as edf_cascade
+        if implicit:
+            return True, "implicit", None
+        if self.density + task["C"] / min(task["D"], task["T"]) <= 1:
+            return True, "density", None
+        # the core is feasible without task, so only instants from its
+        # deadline on can fail
+        return (quick_processor_demand_analysis(self.tasks + [task], utilization,
+                                                min(task["D"], task["T"])),
+                "qpa", None)
+
+    def add(self, task, R=None):
+        """adds task, R are its response times as given by admission"""
+        self.tasks.append(task)
+        self.utilization += task["C"] / task["T"]
+        self.implicit = self.implicit and task["D"] == task["T"]
+        self.density += task["C"] / min(task["D"], task["T"])
+        self.hyperbolic *= task["C"] / task["D"] + 1
+        position = bisect_right(self.D, task["D"])
+        self.order.insert(position, task)
+        self.C.insert(position, task["C"])
+        self.T.insert(position, task["T"])
+        self.D.insert(position, task["D"])
+        if self.policy == "dm":
+            self.R = R
+
+    def try_add(self, task):
+        """adds task if the core stays schedulable, returns whether it did"""
+        admitted, _, R = self.admission(task)
+        if admitted:
+            self.add(task, R)
+        return admitted
+
+    def remove(self, task):
+        """
+        Removes task (the same object that was added). The core stays
+        schedulable, only the response times of the lower priority tasks
+        are computed again
+        """
+        self.tasks.remove(task)
+        position = next(i for i, other in enumerate(self.order) if other is task)
+        for column in (self.order, self.C, self.T, self.D):
+            del column[position]
+        # sums are taken again instead of subtracting, so rounding errors
+        # don't pile up over a long run of additions and removals
+        self.utilization = sum(t["C"] / t["T"] for t in self.tasks)
+        self.density = sum(t["C"] / min(t["D"], t["T"]) for t in self.tasks)
+        self.hyperbolic = math.prod(t["C"] / t["D"] + 1 for t in self.tasks)
+        self.implicit = all(t["D"] == t["T"] for t in self.tasks)
+        if self.policy == "dm" and self.R is not None:
+            del self.R[position]
+            self.R = self._response_times(position)
+
+
+def _candidates(cores, heuristic):
+    if heuristic == "ffd":
+        return cores
+    if heuristic == "bfd":
+        return sorted(cores, key=lambda core: -core.utilization)
+    return sorted(cores, key=lambda core: core.utilization)
+
+
+def partition(tasks, policy="edf", heuristic="ffd", cores=None):
+    """
+    Places tasks by decreasing utilization. With cores=None new cores are
+    opened as needed, otherwise at most that many are used.
+    Returns the list of Core, or None when some task can't be placed
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic {heuristic!r}, expected one of {HEURISTICS}")
+    placed = []
+    for task in sorted(tasks, key=lambda task: -task["C"] / task["T"]):
+        for core in _candidates(placed, heuristic):
+            if core.try_add(task):
+                break
+        else:
+            if cores is not None and len(placed) == cores:
+                return None
+            core = Core(policy)
+            if not core.try_add(task):
+                # not schedulable even alone
+                return None
+            placed.append(core)
+    return placed
+
+
+def minimum_cores(tasks, policy="edf", heuristic="ffd"):
+    """cores the heuristic needs, None when a task is not schedulable alone"""
+    placed = partition(tasks, policy, heuristic)
+    return None if placed is None else len(placed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cores needed by partitioned RM, DM and EDF")
+    parser.add_argument("filename", nargs="?", default="task_list.txt")
+    parser.add_argument("--policies", type=lambda text: text.split(","), default=list(POLICIES))
+    parser.add_argument("--heuristics", type=lambda text: text.split(","), default=list(HEURISTICS))
+    args = parser.parse_args()
+
+    totals = {}
+    for scenario, tasks in iter_task_sets(args.filename):
+        stats = totals.setdefault(scenario["utilization"], {"sets": 0, "bound": 0, "cores": {}})
+        stats["sets"] += 1
+        # no partition can use fewer than ceil(U) cores
+        stats["bound"] += math.ceil(sum(task["C"] / task["T"] for task in tasks) - 1e-9)
+        implicit = all(task["D"] == task["T"] for task in tasks)
+        for policy in args.policies:
+            if policy == "rm" and not implicit:
+                continue
+            for heuristic in args.heuristics:
+                cores = minimum_cores(tasks, policy, heuristic)
+                count = stats["cores"].setdefault((policy, heuristic), [0, 0])
+                if cores is None:
+                    count[1] += 1
+                else:
+                    count[0] += cores
+
+    for utilization, stats in totals.items():
+        print(f"-- Utilization: {utilization}, lower bound: {stats['bound'] / stats['sets']:.2f} cores --")
+        for (policy, heuristic), (cores, unschedulable) in stats["cores"].items():
+            placed = stats["sets"] - unschedulable
+            average = f"{cores / placed:.2f}" if placed else "-"
+            print(f"{policy.upper()} {heuristic.upper()}: {average} cores, "
+                  f"{unschedulable} task sets with an unschedulable task")
+        print()
@@ -0,0 +1,155 @@
+import argparse
+import queue
+from multiprocessing import BoundedSemaphore, Process, Queue
+
+import numpy as np
+
+from uunifast import uunifastsBatch, writeTaskSetRows
+from feasibility_tests import print_feasibility_ratios, use_report_encoding
+from feasibility_batch import evaluate_batch
+from feasibility_stats import FeasibilityAggregator, write_results
+
+# Pipelined generate -> test -> write
+# One process generates batches of task sets, a pool of tester processes
+# runs RM/DM/EDF over them and the main process counts and writes the
+# results. Stages talk through bounded queues: the generator blocks when
+# the testers fall behind, so while the current batches are analysed the
+# next one is already being generated, and memory stays at a few batches
+# whatever the number of task sets.
+# Testers can finish batches out of order and the main process puts them
+# back in order. The generator takes a credit of window per batch and the
+# main process gives it back once the batch is counted, so at most window
+# batches are ever waiting to be reordered, however slow one tester is
+
+# end of stream marker
+DONE = None
+
+
+def generate_stage(batches, window, testers, utilizations, sets, tasks, implicit, alpha,
+                   batch_size, seed, task_file=None):
+    """
+    Generates every scenario in batches, puts (batch number, scenario index,
+    scenario, C, T, D) into batches and one DONE per tester at the end.
+    Each batch takes a credit of window first.
+    Also writes task_list.txt when task_file is given, so the corpus can be
+    tested again later
+    """
+    rng = np.random.default_rng(seed)
+    file = open(task_file, "w") if task_file else None
+    number = 0
+    for index, utilization in enumerate(utilizations):
+        scenario = {"utilization": utilization, "total_task_sets": sets, "tasks_per_set": tasks}
+        if file:
+            file.write(f"{sets} {tasks} {utilization}\n")
+        for start in range(0, sets, batch_size):
+            C, T, D = uunifastsBatch(min(batch_size, sets - start), tasks, implicit,
+                                     utilization, rng, alpha)
+            if file:
+                writeTaskSetRows(C, T, D, file, start + 1)
+            window.acquire()
+            batches.put((number, index, scenario, C, T, D))
+            number += 1
+    if file:
+        file.close()
+    for _ in range(testers):
+        batches.put(DONE)
+
+
+def test_stage(batches, results):
+    """runs the tests over batches until DONE, puts (batch number, scenario index, verdicts)"""
+    while True:
+        batch = batches.get()
+        if batch is DONE:
+            results.put(DONE)
+            return
+        number, index, scenario, C, T, D = batch
+        verdicts = list(zip(*evaluate_batch(C, T, D, scenario["utilization"])))
+        results.put((number, index, verdicts))
+
+
+def run_pipeline(utilizations, sets, tasks, implicit=False, alpha=0.60, batch_size=256,
+                 testers=2, queue_size=4, seed=None, task_file=None, verdict_file=None):
+    """
+    Runs the three stages and returns the per method results of a
+    FeasibilityAggregator. Batches are counted in generation order, so the
+    results don't depend on the number of testers
+    """
+    batches = Queue(queue_size)
+    results = Queue(queue_size)
+    # batches between the generator and the aggregation, the queues and
+    # the testers hold this many, so the window costs no throughput
+    window = BoundedSemaphore(2 * queue_size + testers)
+
+    generator = Process(target=generate_stage,
+                        args=(batches, window, testers, utilizations, sets, tasks, implicit, alpha,
+                              batch_size, seed, task_file))
+    workers = [Process(target=test_stage, args=(batches, results)) for _ in range(testers)]
+    generator.start()
+    for worker in workers:
+        worker.start()
+
+    aggregator = FeasibilityAggregator()
+    for utilization in utilizations:
+        aggregator.add_scenario({"utilization": utilization, "total_task_sets": sets,
+                                 "tasks_per_set": tasks})
+
+    verdicts_out = open(verdict_file, "w") if verdict_file else None
+    # batches finishing out of order wait here, at most window of them
+    waiting = {}
+    next_number = 0
+    finished = 0
+    while finished < testers:
+        try:
+            item = results.get(timeout=1)
+        except queue.Empty:
+            failed = [p for p in [generator] + workers if p.exitcode not in (None, 0)]
+            if failed:
+                for process in [generator] + workers:
+                    process.terminate()
+                raise RuntimeError("a pipeline stage failed")
+            continue
+        if item is DONE:
+            finished += 1
+            continue
+        waiting[item[0]] = item
+        while next_number in waiting:
+            _, index, verdicts = waiting.pop(next_number)
+            for set_verdicts in verdicts:
+                aggregator.add(index, set_verdicts)
+                if verdicts_out:
+                    verdicts_out.write(f"{index} " + " ".join(str(int(v)) for v in set_verdicts) + "\n")
+            next_number += 1
+            window.release()
+
+    generator.join()
+    for worker in workers:
+        worker.join()
+    if verdicts_out:
+        verdicts_out.close()
+    return aggregator.results()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generation, feasibility tests and results in a pipeline")
+    parser.add_argument("--utilizations", type=lambda text: [float(v) for v in text.split(",")],
+                        default=[round(u, 2) for u in np.arange(0.65, 1.01, 0.05)])
+    parser.add_argument("--sets", type=int, default=10000, help="task sets per utilization")
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per set")
+    parser.add_argument("--implicit", action="store_true", help="implicit deadlines")
+    parser.add_argument("--alpha", type=float, default=0.60)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--testers", type=int, default=2, help="tester processes")
+    parser.add_argument("--queue-size", type=int, default=4, help="batches waiting between stages")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--task-file", help="also write the generated task sets here")
+    parser.add_argument("--verdicts", help="write 'scenario rm dm edf' for every task set here")
+    parser.add_argument("--results", help="write ratios and confidence intervals as JSON")
+    args = parser.parse_args()
+    use_report_encoding()
+
+    results = run_pipeline(args.utilizations, args.sets, args.tasks, args.implicit, args.alpha,
+                           args.batch_size, args.testers, args.queue_size, args.seed,
+                           args.task_file, args.verdicts)
+    print_feasibility_ratios(*results)
+    if args.results:
+        write_results(args.results, results)
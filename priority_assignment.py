@@ -0,0 +1,177 @@
+import argparse
+import math
+import sys
+import time
+
+from feasibility_tests import response_time
+
+# Audsley's optimal priority assignment (OPA)
+# Priorities are given from the lowest up: at each level, any unassigned task
+# which meets its deadline with all the other unassigned tasks above it gets
+# that level, and the set is unschedulable under every fixed priority order
+# when no task can (Audsley, 2001). The check of a candidate is the response
+# time analysis of feasibility_tests.py (response_time) with the rest of the
+# unassigned tasks as its higher priority set, extended to D > T with the
+# busy period analysis of Lehoczky (1990), where deadline monotonic is no
+# longer optimal.
+#
+# Two things keep it far below the naive n^2 / 2 response time analyses:
+#  - candidates are tried by decreasing deadline, so with D <= T (where DM is
+#    optimal) the first one passes on every level of a schedulable set, and
+#    when it fails no other order can work, so the search stops there
+#  - the level busy period is the same for every candidate of a level, its
+#    interference is kept per instant so candidates share its evaluations
+
+
+class Interference:
+    """sum(ceil(t / T_j) * C_j) over a set of tasks, remembered per instant"""
+
+    def __init__(self, C, T, members, cached=True):
+        self.C = [C[j] for j in members]
+        self.T = [T[j] for j in members]
+        self.cached = cached
+        self.values = {}
+        self.evaluations = 0
+        self.hits = 0
+
+    def total(self, t):
+        if self.cached and t in self.values:
+            self.hits += 1
+            return self.values[t]
+        self.evaluations += 1
+        value = sum(math.ceil(t / T_j) * C_j for C_j, T_j in zip(self.C, self.T))
+        if self.cached:
+            self.values[t] = value
+        return value
+
+
+def busy_period(start, interference):
+    """least fixed point of interference.total from start"""
+    w = start
+    while True:
+        w_next = interference.total(w)
+        if w_next == w:
+            return w
+        w = w_next
+
+
+def lowest_priority_response_time(i, C, T, D, unassigned, interference):
+    """
+    Worst case response time of task i below every other task of unassigned,
+    None when a job misses its deadline. interference covers all of
+    unassigned, i included
+    """
+    C_i, T_i, D_i = C[i], T[i], D[i]
+    C_hp = [C[j] for j in unassigned if j != i]
+    T_hp = [T[j] for j in unassigned if j != i]
+
+    if D_i <= T_i:
+        # the first job after the critical instant is the worst one
+        return response_time(C_i, D_i, C_hp, T_hp, C_i)
+
+    # D > T: every job of the level-i busy period started at the critical
+    # instant has to be checked, job q finishes at least C_i after job q - 1
+    busy = busy_period(C_i, interference)
+    R = w = 0
+    for q in range(math.ceil(busy / T_i)):
+        w = response_time((q + 1) * C_i, q * T_i + D_i, C_hp, T_hp, w + C_i)
+        if w is None:
+            return None
+        R = max(R, w - q * T_i)
+    return R
+
+
+def audsley(tasks, cached=True):
+    """
+    Optimal priority assignment of tasks ({"C", "T", "D"} dicts).
+    Returns (feasible, order, stats): order lists the task indices from the
+    highest priority to the lowest (the levels found before failing when
+    not feasible), stats counts the candidate checks and the interference
+    evaluations of the busy periods. cached=False gives the naive search,
+    candidates in index order and nothing remembered, for comparison
+    """
+    C = [task["C"] for task in tasks]
+    T = [task["T"] for task in tasks]
+    D = [task["D"] for task in tasks]
+    stats = {"checks": 0, "evaluations": 0, "hits": 0}
+    lowest_first = []
+    # the busy period only ends with U <= 1
+    if sum(c / t for c, t in zip(C, T)) > 1:
+        return False, [], stats
+
+    unassigned = list(range(len(tasks)))
+    constrained = False
+    if cached:
+        # reverse of the deadline monotonic order, ties like test_dm's stable sort
+        unassigned.sort(key=lambda i: (D[i], i), reverse=True)
+        constrained = all(d <= t for d, t in zip(D, T))
+    while unassigned:
+        interference = Interference(C, T, unassigned, cached)
+        for position, i in enumerate(unassigned):
+            stats["checks"] += 1
+            if lowest_priority_response_time(i, C, T, D, unassigned, interference) is not None:
+                break
+            if constrained:
+                position = None
+                break
+        else:
+            position = None
+        stats["evaluations"] += interference.evaluations
+        stats["hits"] += interference.hits
+        if position is None:
+            return False, lowest_first[::-1], stats
+        lowest_first.append(unassigned.pop(position))
+    return True, lowest_first[::-1], stats
+
+
+def test_opa(tasks):
+    """feasible under some fixed priority order"""
+    return audsley(tasks)[0]
+
+
+def main(argv=None):
+    from feasibility_tests import iter_task_sets, test_dm, print_report, use_report_encoding
+
+    parser = argparse.ArgumentParser(description="Audsley's optimal priority assignment")
+    parser.add_argument("filename", nargs="?", default="task_list.txt")
+    parser.add_argument("--orders", action="store_true",
+                        help="print the priority order of every task set (task numbers from 1)")
+    parser.add_argument("--naive", action="store_true",
+                        help="also run the naive search and compare its cost")
+    args = parser.parse_args(argv)
+    use_report_encoding()
+
+    totals = {}
+    cost = {"opa": [0.0, 0, 0], "naive": [0.0, 0, 0]}
+    for scenario, tasks in iter_task_sets(args.filename):
+        counts = totals.setdefault(scenario["utilization"], [0, 0, 0])
+        start = time.perf_counter()
+        feasible, order, stats = audsley(tasks)
+        cost["opa"][0] += time.perf_counter() - start
+        cost["opa"][1] += stats["checks"]
+        cost["opa"][2] += stats["evaluations"]
+        if args.naive:
+            start = time.perf_counter()
+            _, _, naive = audsley(tasks, cached=False)
+            cost["naive"][0] += time.perf_counter() - start
+            cost["naive"][1] += naive["checks"]
+            cost["naive"][2] += naive["evaluations"]
+        counts[0] += 1
+        counts[1] += feasible
+        counts[2] += test_dm(tasks)
+        if args.orders:
+            print(" ".join(str(i + 1) for i in order) if feasible else "-")
+
+    print_report([("Optimal Priority Assignment (OPA)",
+                   [(utilization, feasible / sets) for utilization, (sets, feasible, _) in totals.items()]),
+                  ("Deadline Monotonic (DM)",
+                   [(utilization, dm / sets) for utilization, (sets, _, dm) in totals.items()])])
+
+    for name in ("opa", "naive") if args.naive else ("opa",):
+        seconds, checks, evaluations = cost[name]
+        print(f"[{name}] {seconds:.2f} s, {checks} candidate checks, "
+              f"{evaluations} busy period evaluations", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
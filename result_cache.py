@@ -0,0 +1,112 @@
+import hashlib
+import json
+import sqlite3
+
+# On-disk cache of test and simulation results
+# Entries are keyed by a fingerprint of the task set (its C, T, D values in
+# order), the name of the test, its version and any extra parameter, so
+# re-running over a mostly unchanged task_list.txt only computes the new or
+# changed task sets. Bump the version of a test whenever its results change
+
+MISSING = object()
+
+
+def fingerprint(tasks):
+    """
+    Canonical hash of a task set. Floats are hashed through float.hex so
+    the same values always give the same key, whatever their text form was
+    """
+    h = hashlib.sha256()
+    for task in tasks:
+        for key in ("C", "T", "D"):
+            h.update(float(task[key]).hex().encode())
+            h.update(b",")
+        h.update(b";")
+    return h.hexdigest()
+
+
+def cache_key(tasks, test_name, version, *params):
+    """key of one result: task set fingerprint + test name + version + params"""
+    extra = ",".join(repr(p) for p in params)
+    return f"{fingerprint(tasks)}:{test_name}:{version}:{extra}"
+
+
+class ResultCache:
+    """
+    SQLite backed key/value store with LRU eviction. At most max_entries
+    results are kept, the least recently used ones are dropped first
+    """
+
+    def __init__(self, path, max_entries=1_000_000, commit_every=1000):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+        self.size, clock = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM results").fetchone()
+        self.clock = clock
+        self.pending = 0
+        self.hits = 0
+        self.misses = 0
+        # the file may come from a run with a bigger max_entries
+        self._evict()
+
+    def _tick(self):
+        self.clock += 1
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.connection.commit()
+            self.pending = 0
+        return self.clock
+
+    def get(self, key, default=MISSING):
+        row = self.connection.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.connection.execute(
+            "UPDATE results SET last_used = ? WHERE key = ?", (self._tick(), key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        exists = self.connection.execute(
+            "SELECT 1 FROM results WHERE key = ?", (key,)).fetchone()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(value), self._tick()))
+        if exists:
+            return
+        self.size += 1
+        self._evict()
+
+    def _evict(self):
+        if self.size > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                (self.size - self.max_entries,))
+            self.size = self.max_entries
+
+    def cached(self, key, compute):
+        """returns the cached value of key, computing and storing it if missing"""
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,82 @@
+# Run-length encoded schedules
+# A schedule is kept as a list of (start, end, ID) segments, end is exclusive
+# and ID 0 means the processor is idle. The file looks like:
+#
+#   Task Set : 1
+#   0 3 2
+#   3 5 1
+#   Task Set : 2
+#    Missed
+#
+# every task set is written as soon as it's simulated, so a whole run never
+# has to be kept in memory
+
+from bisect import bisect_right
+
+INFINITY = float("inf")
+
+
+def compressSchedule(schedule):
+    # turns one ID per time unit into (start, end, ID) segments
+    segments = []
+    for currentTime, ID in enumerate(schedule):
+        if segments and segments[-1][2] == ID:
+            segments[-1] = (segments[-1][0], currentTime + 1, ID)
+        else:
+            segments.append((currentTime, currentTime + 1, ID))
+    return segments
+
+
+def expandSchedule(segments):
+    # turns (start, end, ID) segments back into one ID per time unit
+    schedule = []
+    for start, end, ID in segments:
+        schedule.extend([ID] * (end - start))
+    return schedule
+
+
+def taskAtTime(segments, currentTime):
+    # ID running at currentTime, None when it's outside of the schedule
+    index = bisect_right(segments, (currentTime, INFINITY, INFINITY)) - 1
+    if index < 0 or currentTime >= segments[index][1]:
+        return None
+    return segments[index][2]
+
+
+def writeTaskSetSchedule(file, TaskSetID, segments):
+    # segments equal to None means a deadline has been missed
+    file.write("Task Set : " + str(TaskSetID) + "\n")
+    if segments is None:
+        file.write(" Missed " + " " + "\n")
+        return
+    for start, end, ID in segments:
+        file.write(str(start) + " " + str(end) + " " + str(ID) + "\n")
+
+
+def readScheduleFile(FileAddress):
+    # yields (TaskSetID, segments) one task set at a time
+    # segments is None for the task sets that missed a deadline
+    with open(FileAddress, 'r') as file:
+        TaskSetID = None
+        segments = None
+        for line in file:
+            if line.startswith("Task Set"):
+                if TaskSetID is not None:
+                    yield TaskSetID, segments
+                TaskSetID = int(line.split(":")[1])
+                segments = []
+            elif line.strip() == "Missed":
+                segments = None
+            elif line.strip():
+                start, end, ID = line.split()
+                segments.append((int(start), int(end), int(ID)))
+        if TaskSetID is not None:
+            yield TaskSetID, segments
+
+
+def readTaskSetSchedule(FileAddress, TaskSetID):
+    # segments of one task set without keeping the others in memory
+    for ID, segments in readScheduleFile(FileAddress):
+        if ID == TaskSetID:
+            return segments
+    raise KeyError("Task Set " + str(TaskSetID) + " is not in " + FileAddress)
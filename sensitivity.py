@@ -0,0 +1,142 @@
+import argparse
+import sys
+
+from feasibility_tests import (test_rm, test_dm, test_edf, iter_task_sets,
+                               TEST_VERSIONS, print_report, use_report_encoding)
+from result_cache import MISSING, ResultCache, cache_key
+
+# Sensitivity analysis: breakdown utilization of a task set
+# Instead of generating a corpus per utilization step, every task set keeps
+# its shape (periods, deadlines and the ratios between execution times) and
+# its C values are scaled until the test fails. The breakdown utilization
+# is the biggest utilization at which the set is still feasible, found by
+# binary search with O(log(1 / tolerance)) calls to the test_* functions
+
+POLICIES = ("rm", "dm", "edf")
+
+
+def scale_tasks(tasks, factor):
+    """copy of tasks with every C multiplied by factor, T and D are kept"""
+    return [{"C": task["C"] * factor, "T": task["T"], "D": task["D"]} for task in tasks]
+
+
+def _feasible(policy, tasks):
+    utilization = sum(task["C"] / task["T"] for task in tasks)
+    if policy == "rm":
+        return test_rm(tasks, utilization)
+    if policy == "dm":
+        return test_dm(tasks)
+    return test_edf(tasks, utilization)
+
+
+class BreakdownSearch:
+    """
+    Binary search of the breakdown utilization of one task set.
+    Verdicts are kept per (policy, utilization) so nothing is tested twice,
+    and the searches share what they learn: DM can't break down after EDF,
+    which is optimal, and RM (implicit deadlines only) is a sufficient
+    test for the same priority order as DM, so it can't pass where DM fails
+    """
+
+    def __init__(self, tasks, tolerance=1e-3, cache=None):
+        self.tasks = tasks
+        self.tolerance = tolerance
+        self.cache = cache
+        self.utilization = sum(task["C"] / task["T"] for task in tasks)
+        self.verdicts = {}
+        self.tests = 0
+
+    def feasible(self, policy, utilization):
+        key = (policy, utilization)
+        if key not in self.verdicts:
+            scaled = scale_tasks(self.tasks, utilization / self.utilization)
+            verdict = MISSING
+            if self.cache is not None:
+                stored_key = cache_key(scaled, "breakdown-" + policy, TEST_VERSIONS[policy])
+                verdict = self.cache.get(stored_key)
+            if verdict is MISSING:
+                self.tests += 1
+                verdict = _feasible(policy, scaled)
+                if self.cache is not None:
+                    self.cache.put(stored_key, verdict)
+            self.verdicts[key] = verdict
+        return self.verdicts[key]
+
+    def breakdown(self, policy, low=0.0, high=1.0):
+        """
+        Biggest utilization in [low, high] at which policy is feasible,
+        assuming it is feasible at low. Returns 0 when it is not
+        feasible even at the smallest step
+        """
+        if self.utilization == 0:
+            return high
+        if self.feasible(policy, high):
+            return high
+        while high - low > self.tolerance:
+            middle = (low + high) / 2
+            if self.feasible(policy, middle):
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def run(self):
+        """breakdown utilization for RM (None without implicit deadlines), DM and EDF"""
+        implicit = all(task["D"] == task["T"] for task in self.tasks)
+        edf = self.breakdown("edf")
+        dm = self.breakdown("dm", high=edf)
+        rm = self.breakdown("rm", high=dm) if implicit else None
+        return {"rm": rm, "dm": dm, "edf": edf}
+
+
+def breakdown_utilizations(tasks, tolerance=1e-3, cache=None):
+    return BreakdownSearch(tasks, tolerance, cache).run()
+
+
+def feasibility_curve(breakdowns, utilizations):
+    """
+    ratio of task sets still feasible at each utilization, that is whose
+    breakdown utilization is not smaller than it
+    """
+    import numpy as np
+
+    breakdowns = np.asarray(breakdowns, dtype=float)
+    return [float((breakdowns >= u).mean()) for u in utilizations]
+
+
+def main(argv=None):
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="Breakdown utilization of every task set")
+    parser.add_argument("filename", nargs="?", default="task_list.txt")
+    parser.add_argument("--tolerance", type=float, default=1e-3,
+                        help="width of the utilization interval the search stops at")
+    parser.add_argument("--step", type=float, default=0.01,
+                        help="utilization step of the printed feasibility curves")
+    parser.add_argument("--cache", metavar="PATH", help="reuse verdicts stored in this cache file")
+    args = parser.parse_args(argv)
+    use_report_encoding()
+
+    cache = ResultCache(args.cache) if args.cache else None
+    breakdowns = {policy: [] for policy in POLICIES}
+    tests = 0
+    for scenario, tasks in iter_task_sets(args.filename):
+        search = BreakdownSearch(tasks, args.tolerance, cache)
+        for policy, utilization in search.run().items():
+            if utilization is not None:
+                breakdowns[policy].append(utilization)
+        tests += search.tests
+    if cache is not None:
+        cache.close()
+
+    print(f"{tests} tests run", file=sys.stderr)
+
+    utilizations = [round(u, 4) for u in np.arange(args.step, 1 + args.step / 2, args.step)]
+    names = {"rm": "Rate Monotonic (RM)", "dm": "Deadline Monotonic (DM)",
+             "edf": "Earliest Deadline First (EDF)"}
+    print_report([(names[policy], zip(utilizations, feasibility_curve(breakdowns[policy], utilizations)))
+                  for policy in POLICIES if breakdowns[policy]])
+
+
+if __name__ == "__main__":
+    main()
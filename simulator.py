@@ -0,0 +1,257 @@
+import argparse
+import heapq
+
+import instrumentation
+from hyperperiod import hyperPeriod, busyPeriod
+
+# Multi-policy uniprocessor simulator
+# Same discrete-event idea as simulateEventDriven in EDF.py (time jumps
+# between releases, deadlines and completions), but the scheduling choice is
+# a policy instead of being hard-wired to EDF, and every task keeps its own
+# relative deadline D <= T instead of using the period. Jobs are released
+# synchronously at k * T and one job of a task is pending at a time.
+# Besides the verdict it counts preemptions and context switches, so the
+# analytic tests of feasibility_tests.py can be checked against simulation
+#
+# policies:
+#   edf: earliest absolute deadline
+#   rm:  shortest period, fixed priority
+#   dm:  shortest relative deadline, fixed priority (same order as test_dm)
+#   llf: least laxity (deadline - time - remaining), decided every quantum
+#
+# With busy_period the simulation stops at the end of the synchronous busy
+# period instead of the hyperperiod (see hyperperiod.busyPeriod), which
+# gives the same verdict for EDF, RM and DM
+
+POLICIES = ("edf", "rm", "dm", "llf")
+
+# remaining execution under this counts as finished, C values are floats
+EPSILON = 1e-9
+
+
+def task_columns(tasks):
+    """
+    periods, execution times and deadlines of a taskSet, a list of task
+    objects or a list of {"C", "T", "D"} dicts
+    """
+    if hasattr(tasks, "columns"):
+        return list(tasks.period), list(tasks.executionTime), list(tasks.deadline)
+    if tasks and isinstance(tasks[0], dict):
+        return [t["T"] for t in tasks], [t["C"] for t in tasks], [t["D"] for t in tasks]
+    return ([t.Period() for t in tasks], [t.getExecutionTime() for t in tasks],
+            [t.RelativeDeadline() for t in tasks])
+
+
+def _priorities(policy, periods, deadlines):
+    # fixed priority of each task, smaller runs first; ties go to the
+    # smaller index, like the stable sort of test_dm
+    if policy == "rm":
+        return list(periods)
+    if policy == "dm":
+        return list(deadlines)
+    return None
+
+
+def simulate(tasks, policy="edf", horizon=None, stop_at_miss=True, quantum=1,
+             busy_period=False):
+    """
+    Simulates tasks under policy from 0 to horizon (the hyperperiod by
+    default, enough for synchronous releases with D <= T). With busy_period
+    and no horizon it stops at the end of the first busy period, except for
+    llf, which always runs the hyperperiod.
+    Returns a dict with:
+      feasible: no job missed its deadline
+      segments: (start, end, ID) list as in schedule.py, ID 0 is idle time
+      misses: (ID, absolute deadline) of the jobs which missed
+      preemptions: times a job was taken off the processor before finishing
+      context_switches: times the processor was given to a different job
+      jobs: released jobs
+      horizon: time the simulation ran to
+    Without stop_at_miss a job is dropped at its deadline and the
+    simulation carries on
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+    periods, executions, relative = task_columns(tasks)
+    n = len(periods)
+    for i in range(n):
+        if relative[i] > periods[i]:
+            raise ValueError(f"Task {i + 1} has D > T, only constrained deadlines are simulated")
+    if horizon is None and not n:
+        horizon = 0
+    elif horizon is None and busy_period and policy != "llf":
+        horizon = busyPeriod(periods, executions)
+    elif horizon is None:
+        horizon = hyperPeriod(periods)
+    priorities = _priorities(policy, periods, relative)
+
+    remaining = [0] * n
+    deadlines = [0] * n
+    # number of the current job of each task, tells stale heap entries apart
+    job = [0] * n
+    active = [False] * n
+
+    releaseQueue = [(0, i) for i in range(n)]
+    heapq.heapify(releaseQueue)
+    deadlineQueue = []
+    # (key, tie, task, job), EDF ties go to the bigger ID like EDF.py
+    readyQueue = []
+
+    result = {"feasible": True, "segments": [], "misses": [], "preemptions": 0,
+              "context_switches": 0, "jobs": 0, "horizon": horizon}
+    segments = result["segments"]
+    running = None
+    now = 0
+    events = 0
+
+    def check_deadlines(time):
+        # jobs still pending at their deadline have missed it
+        nonlocal running
+        while deadlineQueue and deadlineQueue[0][0] <= time:
+            deadline, i, number = heapq.heappop(deadlineQueue)
+            if active[i] and job[i] == number:
+                result["feasible"] = False
+                result["misses"].append((i + 1, deadline))
+                active[i] = False
+                if running == (i, number):
+                    running = None
+        return result["feasible"] or not stop_at_miss
+
+    while now < horizon:
+        events += 1
+        if not check_deadlines(now):
+            break
+        while releaseQueue and releaseQueue[0][0] == now:
+            _, i = heapq.heappop(releaseQueue)
+            job[i] += 1
+            result["jobs"] += 1
+            heapq.heappush(releaseQueue, (now + periods[i], i))
+            if executions[i] <= EPSILON:
+                continue
+            remaining[i] = executions[i]
+            deadlines[i] = now + relative[i]
+            active[i] = True
+            heapq.heappush(deadlineQueue, (deadlines[i], i, job[i]))
+            if policy == "edf":
+                heapq.heappush(readyQueue, (deadlines[i], -i, i, job[i]))
+            elif priorities is not None:
+                heapq.heappush(readyQueue, (priorities[i], i, i, job[i]))
+
+        nextEvent = min(releaseQueue[0][0] if releaseQueue else horizon, horizon)
+        if deadlineQueue:
+            nextEvent = min(nextEvent, deadlineQueue[0][0])
+
+        if policy == "llf":
+            chosen = None
+            best = None
+            for i in range(n):
+                if active[i]:
+                    key = (deadlines[i] - now - remaining[i], deadlines[i], i)
+                    if best is None or key < best:
+                        best, chosen = key, i
+        else:
+            # drop finished or missed jobs
+            while readyQueue and not (active[readyQueue[0][2]]
+                                      and job[readyQueue[0][2]] == readyQueue[0][3]):
+                heapq.heappop(readyQueue)
+            chosen = readyQueue[0][2] if readyQueue else None
+
+        if chosen is not None and running != (chosen, job[chosen]):
+            if running is not None:
+                result["preemptions"] += 1
+            result["context_switches"] += 1
+            running = (chosen, job[chosen])
+
+        if chosen is None:
+            end = nextEvent
+        else:
+            end = min(now + remaining[chosen], nextEvent)
+            if policy == "llf":
+                end = min(end, now + quantum)
+            remaining[chosen] -= end - now
+            if remaining[chosen] <= EPSILON:
+                remaining[chosen] = 0
+                active[chosen] = False
+                running = None
+
+        ID = 0 if chosen is None else chosen + 1
+        if segments and segments[-1][2] == ID:
+            segments[-1] = (segments[-1][0], end, ID)
+        else:
+            segments.append((now, end, ID))
+        now = end
+    else:
+        # jobs whose deadline is the horizon itself
+        check_deadlines(horizon)
+
+    instrumentation.count("events", events)
+    return result
+
+
+def simulate_policies(tasks, policies=POLICIES, horizon=None, busy_period=False):
+    """verdict, preemptions, context switches and horizon of tasks under each policy"""
+    summary = {}
+    for policy in policies:
+        result = simulate(tasks, policy, horizon, busy_period=busy_period)
+        summary[policy] = {"feasible": result["feasible"],
+                           "preemptions": result["preemptions"],
+                           "context_switches": result["context_switches"],
+                           "horizon": result["horizon"]}
+    return summary
+
+
+def main(argv=None):
+    from feasibility_tests import iter_task_sets, test_rm, test_dm, test_edf
+
+    parser = argparse.ArgumentParser(description="Simulates task sets and checks the analytic tests")
+    parser.add_argument("filename", nargs="?", default="task_list.txt")
+    parser.add_argument("--policies", type=lambda text: text.split(","), default=["rm", "dm", "edf"],
+                        help="comma separated, among " + ", ".join(POLICIES))
+    parser.add_argument("--busy-period", action="store_true",
+                        help="stop at the end of the synchronous busy period instead of the "
+                             "hyperperiod, preemptions are then counted over that time only")
+    args = parser.parse_args(argv)
+
+    # rm is only checked one way: Liu & Layland is sufficient, a set can
+    # fail the test and still be schedulable. dm (RTA) and edf (QPA) are exact
+    analyses = {"rm": test_rm, "dm": lambda tasks, u: test_dm(tasks), "edf": test_edf}
+    exact = {"dm", "edf"}
+
+    for policy in args.policies:
+        if policy not in POLICIES:
+            parser.error(f"unknown policy {policy}")
+    totals = {}
+    for scenario, tasks in iter_task_sets(args.filename):
+        utilization = scenario["utilization"]
+        stats = totals.setdefault(utilization, {policy: {"sets": 0, "feasible": 0, "preemptions": 0,
+                                                          "context_switches": 0, "mismatches": 0,
+                                                          "horizon": 0}
+                                                for policy in args.policies})
+        implicit = all(task["D"] == task["T"] for task in tasks)
+        for policy, result in simulate_policies(tasks, args.policies,
+                                                   busy_period=args.busy_period).items():
+            policy_stats = stats[policy]
+            policy_stats["sets"] += 1
+            policy_stats["feasible"] += result["feasible"]
+            policy_stats["preemptions"] += result["preemptions"]
+            policy_stats["context_switches"] += result["context_switches"]
+            policy_stats["horizon"] += result["horizon"]
+            if policy in analyses and not (policy == "rm" and not implicit):
+                verdict = analyses[policy](tasks, sum(task["C"] / task["T"] for task in tasks))
+                if (verdict and not result["feasible"]) or (policy in exact and verdict != result["feasible"]):
+                    policy_stats["mismatches"] += 1
+
+    for policy in args.policies:
+        print(f"-- {policy.upper()} --")
+        for utilization, stats in totals.items():
+            s = stats[policy]
+            print(f"Utilization: {utilization}, Feasibility Ratio: {s['feasible'] / s['sets']:.2%}, "
+                  f"Preemptions: {s['preemptions'] / s['sets']:.1f}, "
+                  f"Context switches: {s['context_switches'] / s['sets']:.1f}, "
+                  f"Horizon: {float(s['horizon'] / s['sets']):.1f}, "
+                  f"Mismatches: {s['mismatches']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
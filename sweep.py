@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import sys
+
+from uunifast import uunifastsBatch
+from feasibility_tests import run_feasibility_tests, task_sets_from_arrays
+
+# Parameter sweep over utilization x alpha x number of tasks
+# Every cell of the grid is generated and tested in memory, no task_list.txt
+# in between, and appended to a JSON lines checkpoint as soon as it's done.
+# Running the same command again skips the cells already in the checkpoint,
+# so a killed sweep resumes where it stopped. Cells are keyed by the base
+# seed too, a different --seed runs them again. Each cell has its own seed,
+# derived from the base seed and its parameters, so results don't depend on
+# the order cells are run in or on how many times the sweep was resumed
+
+
+def parse_values(text):
+    """'0.65:1.0:0.05' gives a range (end included), '0.2,0.6' a list"""
+    if ":" in text:
+        import numpy as np
+
+        start, stop, step = map(float, text.split(":"))
+        return [round(v, 6) for v in np.arange(start, stop + step / 2, step)]
+    return [float(v) for v in text.split(",")]
+
+
+def cell_seed(seed, utilization, alpha, tasks):
+    import numpy as np
+
+    return np.random.SeedSequence(
+        [seed, round(utilization * 10**6), round(alpha * 10**6), tasks])
+
+
+def run_cell(utilization, alpha, tasks, sets, seed, workers=1, chunksize=64):
+    """feasibility ratios of RM, DM and EDF for one cell of the grid"""
+    C, T, D = uunifastsBatch(sets, tasks, alpha == 0, utilization,
+                             cell_seed(seed, utilization, alpha, tasks), alpha)
+    scenario = {"utilization": utilization, "total_task_sets": sets, "tasks_per_set": tasks}
+    rm, dm, edf = run_feasibility_tests(
+        ((scenario, task_set) for task_set in task_sets_from_arrays(C, T, D)),
+        workers, chunksize)
+    return {"utilization": utilization, "alpha": alpha, "tasks": tasks, "sets": sets,
+            "rm": rm[0]["feasibility_ratio"], "dm": dm[0]["feasibility_ratio"],
+            "edf": edf[0]["feasibility_ratio"], "seed": seed}
+
+
+def _cell(result):
+    # checkpoints written before the seed was stored never match, so their
+    # cells are run again
+    return (result["utilization"], result["alpha"], result["tasks"], result["sets"],
+            result.get("seed"))
+
+
+def _read_checkpoint(path):
+    """finished cells of a checkpoint and the offset where the last whole line ends"""
+    results = []
+    end = 0
+    if not os.path.exists(path):
+        return results, end
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                results.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            end += len(line)
+    return results, end
+
+
+def read_checkpoint(path):
+    """finished cells of a checkpoint, a partly written last line is ignored"""
+    return _read_checkpoint(path)[0]
+
+
+def run_sweep(utilizations, alphas, task_counts, sets, checkpoint, seed=0,
+              workers=1, chunksize=64):
+    """runs every cell that is not in the checkpoint yet, returns all results"""
+    results, end = _read_checkpoint(checkpoint)
+    done = {_cell(result) for result in results}
+
+    cells = [(u, a, n) for n in task_counts for a in alphas for u in utilizations]
+    with open(checkpoint, "ab") as f:
+        # drop a half written line in place, the finished cells are never rewritten
+        f.truncate(end)
+        for index, (utilization, alpha, tasks) in enumerate(cells, 1):
+            if (utilization, alpha, tasks, sets, seed) in done:
+                continue
+            print(f"[{index}/{len(cells)}] U = {utilization}, alpha = {alpha}, n = {tasks}",
+                  file=sys.stderr)
+            result = run_cell(utilization, alpha, tasks, sets, seed, workers, chunksize)
+            f.write((json.dumps(result) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep over utilization x alpha x task count")
+    parser.add_argument("--utilizations", type=parse_values, default="0.65:1.0:0.05",
+                        help="start:stop:step or comma separated values")
+    parser.add_argument("--alphas", type=parse_values, default="0.6",
+                        help="deadline ratio of generateTaskFromUtilization, 0 gives implicit deadlines")
+    parser.add_argument("--tasks", type=lambda text: [int(v) for v in text.split(",")],
+                        default="100", help="comma separated task counts")
+    parser.add_argument("--sets", type=int, default=10000, help="task sets per cell")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default="sweep.jsonl",
+                        help="finished cells are appended here and skipped on the next run")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    results = run_sweep(args.utilizations, args.alphas, args.tasks, args.sets,
+                        args.checkpoint, args.seed, args.workers, args.chunk_size)
+    print(f"{len(results)} cells in {args.checkpoint}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import random
+from array import array
+from hyperperiod import periodChoices
 
 
-def generateTaskFromUtilization(UtilizationSet, ImplicitDeadline):
+def generateTaskFromUtilization(UtilizationSet, ImplicitDeadline, PeriodMode="uniform"):
+    # PeriodMode "harmonic" or "divisor" bound the hyperperiod, see hyperperiod.py
+    choices = None if PeriodMode == "uniform" else periodChoices(PeriodMode)
     taskList = []
     for i in range(len(UtilizationSet)):
-        p = random.randint(2, 10)
+        p = random.randint(2, 10) if choices is None else random.choice(choices)
         e = p * UtilizationSet[i]
 
         if ImplicitDeadline:
@@ -29,6 +33,9 @@ def writeTaskSetToFile(TaskSetID, taskSetList, file):
 
 
 class task(object):
+    __slots__ = ("period", "executionTime", "deadline", "seen", "ID",
+                 "executedTime", "cycle")
+
     def __init__(self, p, e, d):
         self.period = p
         self.executionTime = e
@@ -80,3 +87,184 @@ class task(object):
         #     return False
         # else:
         #     return True
+
+
+def _typecode(values):
+    # integer arrays whenever possible, EDF needs integer periods for LCM
+    return 'q' if all(isinstance(v, int) for v in values) else 'd'
+
+
+class taskSet(object):
+    # a whole task set kept as parallel arrays instead of one object per task
+    # index i holds the task with ID i+1, taskSet[i] gives a light view of it
+    # with the same methods as task, so it can be used wherever a list of
+    # task was used, and view["C"], view["T"], view["D"] lets the
+    # feasibility tests use it in place of their list of dicts
+    __slots__ = ("period", "executionTime", "deadline", "executedTime",
+                 "cycle", "seen", "ID")
+
+    def __init__(self, periods, executionTimes, deadlines):
+        periods = list(periods)
+        executionTimes = list(executionTimes)
+        deadlines = list(deadlines)
+        self.period = array(_typecode(periods), periods)
+        self.executionTime = array(_typecode(executionTimes), executionTimes)
+        self.deadline = array(_typecode(deadlines), deadlines)
+        self.executedTime = array(self.executionTime.typecode, [0] * len(periods))
+        self.cycle = array('q', [1] * len(periods))
+        self.seen = array('b', [0] * len(periods))
+        self.ID = array('q', range(1, len(periods) + 1))
+
+    @classmethod
+    def fromTasks(cls, taskList):
+        newTaskSet = cls([t.Period() for t in taskList],
+                         [t.getExecutionTime() for t in taskList],
+                         [t.RelativeDeadline() for t in taskList])
+        for i in range(len(taskList)):
+            if taskList[i].getID() != -1:
+                newTaskSet.ID[i] = taskList[i].getID()
+        return newTaskSet
+
+    @classmethod
+    def fromDicts(cls, tasks):
+        return cls([t["T"] for t in tasks],
+                   [t["C"] for t in tasks],
+                   [t["D"] for t in tasks])
+
+    def __len__(self):
+        return len(self.period)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.period)
+        if not 0 <= i < len(self.period):
+            raise IndexError("task index out of range")
+        return taskView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.period)):
+            yield taskView(self, i)
+
+    def toDicts(self):
+        return [{"C": c, "T": t, "D": d}
+                for c, t, d in zip(self.executionTime, self.period, self.deadline)]
+
+    def columns(self):
+        # zero-copy NumPy views of C, T and D
+        import numpy as np
+        return (np.frombuffer(self.executionTime, dtype=self.executionTime.typecode),
+                np.frombuffer(self.period, dtype=self.period.typecode),
+                np.frombuffer(self.deadline, dtype=self.deadline.typecode))
+
+    def Utilization(self):
+        return sum(e / p for e, p in zip(self.executionTime, self.period))
+
+    # the methods below work on every task at once, EDF.py uses them
+    # instead of going through the views in its per tick loop
+
+    def checkPeriods(self, currentTime):
+        # resets tasks whose period ends at currentTime, False on a miss
+        executedTime = self.executedTime
+        executionTime = self.executionTime
+        for i, p in enumerate(self.period):
+            if currentTime % p == 0:
+                if executedTime[i] != executionTime[i]:
+                    return False
+                self.seen[i] = 0
+                self.cycle[i] += 1
+                executedTime[i] = 0
+        return True
+
+    def minimumDeadlineNotSeen(self, infinity):
+        # ID of the unseen task with the earliest deadline (last one on ties)
+        minimum = infinity
+        minID = 0
+        for p, c, s, ID in zip(self.period, self.cycle, self.seen, self.ID):
+            if not s and p * c <= minimum:
+                minimum = p * c
+                minID = ID
+        return minID
+
+    def fullyExecuted(self):
+        return self.executedTime == self.executionTime
+
+
+class taskView(object):
+    # one task of a taskSet, reads and writes go to the arrays of the set
+    __slots__ = ("taskSet", "index")
+
+    _KEYS = {"C": "executionTime", "T": "period", "D": "deadline"}
+
+    def __init__(self, taskSet, index):
+        self.taskSet = taskSet
+        self.index = index
+
+    def __getitem__(self, key):
+        return getattr(self.taskSet, self._KEYS[key])[self.index]
+
+    @property
+    def period(self):
+        return self.taskSet.period[self.index]
+
+    @property
+    def executionTime(self):
+        return self.taskSet.executionTime[self.index]
+
+    @property
+    def deadline(self):
+        return self.taskSet.deadline[self.index]
+
+    @property
+    def executedTime(self):
+        return self.taskSet.executedTime[self.index]
+
+    @property
+    def cycle(self):
+        return self.taskSet.cycle[self.index]
+
+    @property
+    def seen(self):
+        return bool(self.taskSet.seen[self.index])
+
+    @property
+    def ID(self):
+        return self.taskSet.ID[self.index]
+
+    def Period(self):
+        return self.taskSet.period[self.index]
+
+    def getExecutionTime(self):
+        return self.taskSet.executionTime[self.index]
+
+    def getExecutedTime(self):
+        return self.taskSet.executedTime[self.index]
+
+    def Utilization(self):
+        return self.executionTime / self.period
+
+    def RelativeDeadline(self):
+        return self.taskSet.deadline[self.index]
+
+    def getSeenFlag(self):
+        return bool(self.taskSet.seen[self.index])
+
+    def seenFlagActivation(self):
+        self.taskSet.seen[self.index] = 1
+        return True
+
+    def setID(self, ID):
+        self.taskSet.ID[self.index] = ID
+
+    def getID(self):
+        return self.taskSet.ID[self.index]
+
+    def reset(self):
+        self.taskSet.seen[self.index] = 0
+        self.taskSet.cycle[self.index] += 1
+        self.taskSet.executedTime[self.index] = 0
+
+    # it's automatically activate seen flag
+    def execute(self, currentTime):
+        self.taskSet.executedTime[self.index] += 1
+        if(self.executedTime == self.executionTime):
+            self.seenFlagActivation()
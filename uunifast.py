@@ -3,8 +3,26 @@
 # UUnifast for making different task sets
 
 import random
-import numpy as np
 from task import task, generateTaskFromUtilization, writeTaskSetToFile
+from hyperperiod import periodChoices, PERIOD_MODES
+
+# nothing runs on import and NumPy is only loaded by the batch functions,
+# the generation itself is main(), see the settings below
+
+# run 1000 time , make 100 job in each list and with 1 utilization
+# set proper values here, they are the defaults of the command line
+RUN = 10000 # how many times we run unifast algorithm
+JOB_NUMBERS = 100 #task number in each list
+# UTILIZATION = 0.85 #Utilization
+IMPLICIT_DEADLINE = False
+# None gives different task sets on every run
+SEED = None
+# set to False to use the original one-by-one generator
+BATCH = True
+# also write task_list.bin, see binary_task_list.py (needs BATCH)
+BINARY = False
+# "uniform", "harmonic" or "divisor", the last two keep hyperperiods small
+PERIOD_MODE = "uniform"
 
 
 def uunifast(n, U):
@@ -24,7 +42,7 @@ def uunifast(n, U):
     return AllSum, vectU
 
 
-def uunifasts(N, n, ID, U, file):
+def uunifasts(N, n, ID, U, file, PeriodMode="uniform"):
     # will be used for configuration propose
     configuration_data = str(N) + " " + str(n) + " " + str(U)
     file.write(configuration_data)
@@ -36,24 +54,116 @@ def uunifasts(N, n, ID, U, file):
         # for example, 0.9999 is unacceptable when utilization(U) is equal to 1
         if(Sum == U):
             # call function that makes the
-            taskSet = generateTaskFromUtilization(Vect, ID)
+            taskSet = generateTaskFromUtilization(Vect, ID, PeriodMode)
 
             #counters seperates outputs of each runs
             writeTaskSetToFile(counter, taskSet, file)
             counter += 1
 
-# run 1000 time , make 100 job in each list and with 1 utilization
-# set proper values here 
-RUN = 10000 # how many times we run unifast algorithm
-JOB_NUMBERS = 100 #task number in each list
-# UTILIZATION = 0.85 #Utilization
-IMPLICIT_DEADLINE = False
 
-# if there is a file at the moment, overwrite on it 
-file = open("task_list.txt", "w")
-for value in np.arange(0.65, 1.01, 0.05):
-    print(f"Generating Task Sets with Utilization = {round(value, 2)}")
-    uunifasts(RUN, JOB_NUMBERS, IMPLICIT_DEADLINE, round(value, 2), file)
-file.close()
+def uunifastBatch(N, n, U, seed=None):
+    # vectorized uunifast, returns an (N, n) matrix with one utilization
+    # vector per row. Instead of throwing away the vectors whose sum is not
+    # exactly U, every row is rescaled and the rounding residue is moved to
+    # its biggest element
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    sumU = np.empty((N, n))
+    sumU[:, 0] = U
+    if n > 1:
+        exponents = 1 / np.arange(n - 1, 0, -1)
+        sumU[:, 1:] = U * np.cumprod(rng.random((N, n - 1)) ** exponents, axis=1)
+    vectU = np.empty((N, n))
+    vectU[:, :-1] = sumU[:, :-1] - sumU[:, 1:]
+    vectU[:, -1] = sumU[:, -1]
+
+    vectU *= U / vectU.sum(axis=1, keepdims=True)
+    biggest = vectU.argmax(axis=1)
+    rows = np.arange(N)
+    vectU[rows, biggest] += U - vectU.sum(axis=1)
+    return vectU
+
+
+def uunifastsBatch(N, n, ID, U, seed=None, alpha=0.60, PeriodMode="uniform",
+                   minPeriod=2, maxPeriod=10):
+    # same task sets as uunifasts but as (N, n) arrays of C, T and D,
+    # ready to be handed to the feasibility tests without any text file
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    vectU = uunifastBatch(N, n, U, rng)
+    if PeriodMode == "uniform":
+        T = rng.integers(minPeriod, maxPeriod + 1, size=(N, n))
+    else:
+        T = rng.choice(periodChoices(PeriodMode, minPeriod, maxPeriod), size=(N, n))
+    C = T * vectU
+    if ID:
+        D = T.astype(float)
+    else:
+        D = (1 - alpha) * T + alpha * C
+    return C, T, D
+
+
+def writeTaskSetArraysToFile(U, C, T, D, file):
+    # writes arrays from uunifastsBatch with the same layout as uunifasts
+    N, n = C.shape
+    file.write(str(N) + " " + str(n) + " " + str(U))
+    file.write("\n")
+    writeTaskSetRows(C, T, D, file)
+
+def writeTaskSetRows(C, T, D, file, first=1):
+    # the task sets of writeTaskSetArraysToFile without the scenario header,
+    # numbered from first, so a scenario can be written one batch at a time
+    n = C.shape[1]
+    for counter, (c, t, d) in enumerate(zip(C.tolist(), T.tolist(), D.tolist()), first):
+        file.write("Task Set : " + str(counter))
+        file.write("\n")
+        for i in range(n):
+            file.write(str(c[i]) + " " + str(t[i]) + " " + str(d[i]) + "\n")
+
+def main(argv=None):
+    import argparse
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="Generates task sets with UUniFast")
+    parser.add_argument("--sets", type=int, default=RUN, help="task sets per utilization")
+    parser.add_argument("--tasks", type=int, default=JOB_NUMBERS, help="tasks per set")
+    parser.add_argument("--implicit", action="store_true", default=IMPLICIT_DEADLINE,
+                        help="implicit deadlines")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--one-by-one", dest="batch", action="store_false", default=BATCH,
+                        help="use the original one-by-one generator")
+    parser.add_argument("--binary", action="store_true", default=BINARY,
+                        help="also write task_list.bin, see binary_task_list.py")
+    parser.add_argument("--period-mode", default=PERIOD_MODE,
+                        choices=PERIOD_MODES)
+    parser.add_argument("--output", default="task_list.txt")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    binaryFile = None
+    if args.binary:
+        from binary_task_list import open_binary_task_list, write_scenario
+        binaryFile = open_binary_task_list(args.output.rsplit(".", 1)[0] + ".bin")
+    # if there is a file at the moment, overwrite on it
+    file = open(args.output, "w")
+    for value in np.arange(0.65, 1.01, 0.05):
+        print(f"Generating Task Sets with Utilization = {round(value, 2)}")
+        if args.batch:
+            C, T, D = uunifastsBatch(args.sets, args.tasks, args.implicit, round(value, 2), rng,
+                                     PeriodMode=args.period_mode)
+            writeTaskSetArraysToFile(round(value, 2), C, T, D, file)
+            if binaryFile is not None:
+                write_scenario(binaryFile, round(value, 2), C, T, D)
+        else:
+            uunifasts(args.sets, args.tasks, args.implicit, round(value, 2), file, args.period_mode)
+    file.close()
+    if binaryFile is not None:
+        binaryFile.close()
+
+    # uunifasts(RUN, JOB_NUMBERS, UTILIZATION)
+
 
-# uunifasts(RUN, JOB_NUMBERS, UTILIZATION)
\ No newline at end of file
+if __name__ == "__main__":
+    main()